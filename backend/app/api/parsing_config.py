@@ -15,6 +15,7 @@ class ParsingConfigCreate(BaseModel):
     section_headers: Optional[Dict[str, List[str]]] = None
     use_default_headers: bool = True
     filter_strings: Optional[List[str]] = None
+    high_value_keywords: Optional[List[str]] = None
 
 
 class ParsingConfigResponse(BaseModel):
@@ -24,6 +25,7 @@ class ParsingConfigResponse(BaseModel):
     section_headers: Optional[Dict[str, List[str]]]
     use_default_headers: bool
     filter_strings: Optional[List[str]]
+    high_value_keywords: Optional[List[str]]
     default_section_headers: Dict[str, List[str]]  # Always include defaults for reference
     
     class Config:
@@ -54,6 +56,7 @@ async def get_parsing_config(project_id: int, db: AsyncSession = Depends(get_db)
             "section_headers": None,
             "use_default_headers": True,
             "filter_strings": None,
+            "high_value_keywords": None,
             "default_section_headers": section_parser.target_sections
         }
     
@@ -64,6 +67,7 @@ async def get_parsing_config(project_id: int, db: AsyncSession = Depends(get_db)
         "section_headers": config.section_headers,
         "use_default_headers": bool(config.use_default_headers),
         "filter_strings": config.filter_strings,
+        "high_value_keywords": config.high_value_keywords,
         "default_section_headers": section_parser.target_sections
     }
 
@@ -93,6 +97,7 @@ async def create_parsing_config(
         existing_config.section_headers = config_data.section_headers
         existing_config.use_default_headers = 1 if config_data.use_default_headers else 0
         existing_config.filter_strings = config_data.filter_strings
+        existing_config.high_value_keywords = config_data.high_value_keywords
         db_config = existing_config
     else:
         # Create new config
@@ -101,7 +106,8 @@ async def create_parsing_config(
             parsing_method=config_data.parsing_method,
             section_headers=config_data.section_headers,
             use_default_headers=1 if config_data.use_default_headers else 0,
-            filter_strings=config_data.filter_strings
+            filter_strings=config_data.filter_strings,
+            high_value_keywords=config_data.high_value_keywords
         )
         db.add(db_config)
     
@@ -115,6 +121,7 @@ async def create_parsing_config(
         "section_headers": db_config.section_headers,
         "use_default_headers": bool(db_config.use_default_headers),
         "filter_strings": db_config.filter_strings,
+        "high_value_keywords": db_config.high_value_keywords,
         "default_section_headers": section_parser.target_sections
     }
 
@@ -1,15 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from pydantic import BaseModel
 from datetime import datetime
 
 from app.models.database import Project, ProcessingJob, Position, Resume, get_db, AsyncSessionLocal
 from app.services.matching_service import matching_service
+from app.services.embedding_service import embedding_service
+from app.services.embedding_backends import OllamaEmbeddingBackend
 from app.services.ollama_service import ollama_service
+from app.services.reembedding_service import reembedding_service
 
 router = APIRouter()
 
 
+class EmbeddingMigrationRequest(BaseModel):
+    model: str  # Ollama model name, e.g. 'mxbai-embed-large'
+
+
 async def process_matches_background(project_id: int):
     """Background task to process matches"""
     async with AsyncSessionLocal() as db:
@@ -18,6 +26,7 @@ async def process_matches_background(project_id: int):
             result = await db.execute(
                 select(ProcessingJob).where(
                     ProcessingJob.project_id == project_id,
+                    ProcessingJob.job_type == "matching",
                     ProcessingJob.status == "pending"
                 ).order_by(ProcessingJob.id.desc()).limit(1)
             )
@@ -28,6 +37,14 @@ async def process_matches_background(project_id: int):
                 job.started_at = datetime.utcnow()
                 await db.commit()
                 
+                # Local backends are refitted on the full project corpus
+                project = await db.get(Project, project_id)
+                if project and project.embedding_backend == "local":
+                    try:
+                        await embedding_service.fit_local_backend(project_id, db)
+                    except ValueError as e:
+                        raise ValueError(f"Could not fit the local embedding model: {e}") from e
+                
                 # Calculate matches
                 result = await matching_service.calculate_matches(project_id, db)
                 
@@ -63,12 +80,14 @@ async def start_processing(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if Ollama is available
-    if not await ollama_service.check_connection():
-        raise HTTPException(
-            status_code=503,
-            detail="Ollama service is not available. Please ensure Ollama is running."
-        )
+    # Check if the project's embedding backend is available
+    backend = await embedding_service.get_backend(project_id, db)
+    if not await backend.is_available():
+        if isinstance(backend, OllamaEmbeddingBackend):
+            detail = f"Ollama service is not available for {backend.model_id}. Please ensure Ollama is running."
+        else:
+            detail = f"The project's {project.embedding_backend} embedding backend is not available"
+        raise HTTPException(status_code=503, detail=detail)
     
     # Check if project has positions and resumes
     positions_count = await db.scalar(
@@ -86,6 +105,7 @@ async def start_processing(
     # Create processing job
     job = ProcessingJob(
         project_id=project_id,
+        job_type="matching",
         status="pending",
         progress=0
     )
@@ -103,6 +123,93 @@ async def start_processing(
     }
 
 
+async def reembed_project_background(job_id: int, target_model: str):
+    """Background task to migrate a project's embeddings to a new model"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ProcessingJob, job_id)
+        if not job:
+            return
+        
+        try:
+            job.status = "processing"
+            job.started_at = datetime.utcnow()
+            await db.commit()
+            
+            await reembedding_service.reembed_project(job.project_id, target_model, job, db)
+            
+            job.status = "completed"
+            job.progress = 100
+            job.completed_at = datetime.utcnow()
+            await db.commit()
+            
+        except Exception as e:
+            # Staged embeddings are kept so a retry resumes where this stopped;
+            # the current embeddings keep serving in the meantime
+            await db.rollback()
+            job = await db.get(ProcessingJob, job_id)
+            project = await db.get(Project, job.project_id)
+            project.target_embedding_model = None
+            job.status = "failed"
+            job.error_message = str(e)
+            job.completed_at = datetime.utcnow()
+            await db.commit()
+
+
+@router.post("/projects/{project_id}/embeddings/migrate")
+async def migrate_embeddings(
+    project_id: int,
+    migration: EmbeddingMigrationRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-embed a project with a new model in the background, then switch to it"""
+    result = await db.execute(select(Project).where(Project.id == project_id))
+    project = result.scalar_one_or_none()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    if project.embedding_backend == "local":
+        raise HTTPException(
+            status_code=400,
+            detail="Local embedding models are refitted when processing starts"
+        )
+    
+    target_model = OllamaEmbeddingBackend(migration.model).model_id
+    if target_model == project.embedding_model:
+        raise HTTPException(status_code=400, detail=f"Project already uses {target_model}")
+    
+    if project.target_embedding_model:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Migration to {project.target_embedding_model} is already in progress"
+        )
+    
+    if not await ollama_service.check_connection():
+        raise HTTPException(
+            status_code=503,
+            detail="Ollama service is not available. Please ensure Ollama is running."
+        )
+    
+    project.target_embedding_model = target_model
+    job = ProcessingJob(
+        project_id=project_id,
+        job_type="reembed",
+        status="pending",
+        progress=0
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    
+    background_tasks.add_task(reembed_project_background, job.id, target_model)
+    
+    return {
+        "job_id": job.id,
+        "status": "started",
+        "message": f"Re-embedding project from {project.embedding_model} to {target_model}"
+    }
+
+
 @router.get("/jobs/{job_id}/status")
 async def get_job_status(job_id: int, db: AsyncSession = Depends(get_db)):
     """Get processing job status"""
@@ -114,9 +221,11 @@ async def get_job_status(job_id: int, db: AsyncSession = Depends(get_db)):
     
     return {
         "job_id": job.id,
+        "job_type": job.job_type or "matching",
         "status": job.status,
         "progress": job.progress,
         "error_message": job.error_message,
+        "details": job.details,
         "started_at": job.started_at,
         "completed_at": job.completed_at
     }
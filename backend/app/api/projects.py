@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from app.models.database import Project, get_db
+from app.config import settings
+from app.services.embedding_backends import EMBEDDING_BACKENDS, OllamaEmbeddingBackend
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -12,6 +14,7 @@ router = APIRouter()
 
 class ProjectCreate(BaseModel):
     name: str
+    embedding_backend: Optional[str] = None  # 'ollama' or 'local', defaults to settings
 
 
 class ProjectResponse(BaseModel):
@@ -20,6 +23,9 @@ class ProjectResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     status: str
+    embedding_backend: Optional[str] = None
+    embedding_model: Optional[str] = None
+    target_embedding_model: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -28,7 +34,23 @@ class ProjectResponse(BaseModel):
 @router.post("/", response_model=ProjectResponse)
 async def create_project(project: ProjectCreate, db: AsyncSession = Depends(get_db)):
     """Create a new project"""
-    db_project = Project(name=project.name)
+    embedding_backend = project.embedding_backend or settings.default_embedding_backend
+    if embedding_backend not in EMBEDDING_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid embedding backend. Use one of: {', '.join(EMBEDDING_BACKENDS)}"
+        )
+    
+    # Local projects get their model id when the model is first fitted
+    embedding_model = None
+    if embedding_backend == "ollama":
+        embedding_model = OllamaEmbeddingBackend().model_id
+    
+    db_project = Project(
+        name=project.name,
+        embedding_backend=embedding_backend,
+        embedding_model=embedding_model
+    )
     db.add(db_project)
     await db.commit()
     await db.refresh(db_project)
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel
+from datetime import datetime
 import pandas as pd
 import numpy as np
 import json
@@ -10,13 +12,21 @@ import os
 import uuid
 from pathlib import Path
 
-from app.models.database import Project, Position, Resume, ParsingConfiguration, get_db
+from app.models.database import Project, Position, Resume, ProcessingJob, get_db, AsyncSessionLocal
 from app.config import settings
-from app.services.pdf_processor import pdf_processor
 from app.services.embedding_service import embedding_service
+from app.services.archive_ingest import ARCHIVE_FORMATS, archive_format, archive_ingest_service
+from app.services.file_storage import file_storage, FileTooLargeError
+from app.services.resume_ingest import resume_ingest_service
 
 router = APIRouter()
 
+EMBEDDING_MODES = ("concatenated", "composed")
+
+
+class ColumnWeightsUpdate(BaseModel):
+    column_weights: Dict[str, float]
+
 
 def clean_nan_values(data: Any) -> Any:
     """Recursively clean NaN values from data structures"""
@@ -73,12 +83,21 @@ async def confirm_positions(
     file: UploadFile = File(...),
     embedding_columns: str = Form(...),
     output_columns: str = Form(...),
+    embedding_mode: str = Form("concatenated"),
+    column_weights: Optional[str] = Form(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Confirm positions with selected columns and generate embeddings"""
     # Parse column selections
     embedding_cols = json.loads(embedding_columns)
     output_cols = json.loads(output_columns)
+    weights = json.loads(column_weights) if column_weights else None
+    
+    if embedding_mode not in EMBEDDING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid embedding mode. Use one of: {', '.join(EMBEDDING_MODES)}"
+        )
     
     # Read file again
     if file.filename.endswith('.csv'):
@@ -91,21 +110,37 @@ async def confirm_positions(
     # Delete existing positions for this project
     await db.execute(delete(Position).where(Position.project_id == project_id))
     
+    backend = await embedding_service.get_backend(project_id, db)
+    
+    # In composed mode each distinct column value is embedded once and reused
+    column_vectors = None
+    if embedding_mode == "composed":
+        column_vectors = await embedding_service.get_column_value_embeddings(
+            project_id, positions_data, embedding_cols, db, backend
+        )
+    
     # Create positions with embeddings
     created_count = 0
     for row_data in positions_data:
         # Generate embedding
-        embedding = await embedding_service.generate_position_embedding(
-            row_data, embedding_cols
-        )
+        if embedding_mode == "composed":
+            embedding = embedding_service.compose_position_embedding(
+                row_data, embedding_cols, column_vectors, weights
+            )
+        else:
+            embedding = await embedding_service.generate_position_embedding(
+                row_data, embedding_cols, backend
+            )
         
         position = Position(
             project_id=project_id,
             original_data=row_data,
             embedding_columns=embedding_cols,
             output_columns=output_cols,
-            embedding=embedding
+            embedding_mode=embedding_mode,
+            column_weights=weights
         )
+        embedding_service.assign_embedding(position, embedding, backend)
         db.add(position)
         created_count += 1
     
@@ -113,7 +148,57 @@ async def confirm_positions(
     
     return {
         "message": "Positions created successfully",
-        "count": created_count
+        "count": created_count,
+        "embedding_mode": embedding_mode
+    }
+
+
+@router.put("/projects/{project_id}/positions/column-weights")
+async def update_column_weights(
+    project_id: int,
+    weights_data: ColumnWeightsUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Recompose position embeddings with new column weights without re-embedding"""
+    result = await db.execute(
+        select(Position).where(
+            Position.project_id == project_id,
+            Position.embedding_mode == "composed"
+        )
+    )
+    positions = result.scalars().all()
+    
+    if not positions:
+        raise HTTPException(
+            status_code=400,
+            detail="No positions using composed embeddings found in project"
+        )
+    
+    backend = await embedding_service.get_backend(project_id, db)
+    column_vectors = await embedding_service.get_column_value_embeddings(
+        project_id,
+        [position.original_data for position in positions],
+        positions[0].embedding_columns,
+        db,
+        backend
+    )
+    
+    for position in positions:
+        embedding = embedding_service.compose_position_embedding(
+            position.original_data,
+            position.embedding_columns,
+            column_vectors,
+            weights_data.column_weights
+        )
+        embedding_service.assign_embedding(position, embedding, backend)
+        position.column_weights = weights_data.column_weights
+    
+    await db.commit()
+    
+    return {
+        "message": "Column weights updated successfully",
+        "count": len(positions),
+        "column_weights": weights_data.column_weights
     }
 
 
@@ -131,18 +216,10 @@ async def upload_resumes(
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Get parsing configuration for the project
-    config_result = await db.execute(
-        select(ParsingConfiguration).where(ParsingConfiguration.project_id == project_id)
-    )
-    parsing_config = config_result.scalar_one_or_none()
+    parsing_method, parsing_profile, keywords = await resume_ingest_service.get_parsing_options(project_id, db)
     
-    # Determine parsing method
-    parsing_method = "full_text"
-    custom_headers = None
-    if parsing_config:
-        parsing_method = parsing_config.parsing_method
-        if not parsing_config.use_default_headers and parsing_config.section_headers:
-            custom_headers = parsing_config.section_headers
+    # Local backends embed at processing time until the project model is fitted
+    backend = await embedding_service.get_backend(project_id, db)
     
     upload_results = []
     
@@ -162,7 +239,8 @@ async def upload_resumes(
         if total_files > 100:
             print(f"Processing batch {batch_start//batch_size + 1}/{(total_files + batch_size - 1)//batch_size}: files {batch_start + 1}-{batch_end}")
         
-        # Process current batch
+        # Save current batch to disk
+        saved_files = []
         for file in batch_files:
             if not file.filename.endswith('.pdf'):
                 upload_results.append({
@@ -173,70 +251,15 @@ async def upload_resumes(
                 continue
         
             try:
-                # Save file
                 file_id = str(uuid.uuid4())
                 file_path = os.path.join(settings.upload_dir, f"{file_id}.pdf")
                 
-                with open(file_path, "wb") as f:
-                    content = await file.read()
-                    f.write(content)
-                
-                # Validate PDF
-                if not pdf_processor.validate_pdf(file_path):
-                    os.remove(file_path)
-                    upload_results.append({
-                        "filename": file.filename,
-                        "status": "error",
-                        "message": "Invalid PDF file"
-                    })
-                    continue
-                
-                # Extract text, clean it, and optionally parse sections
-                raw_text, cleaned_text, parsed_sections = pdf_processor.extract_and_parse_pdf(
-                    file_path, 
-                    parsing_method=parsing_method,
-                    custom_headers=custom_headers,
-                    clean_text=True,
-                    cleaning_intensity="medium"
-                )
-                
-                if not raw_text or not cleaned_text:
-                    os.remove(file_path)
-                    upload_results.append({
-                        "filename": file.filename,
-                        "status": "error",
-                        "message": "Could not extract text from PDF"
-                    })
-                    continue
-                
-                # Generate embedding using cleaned text for better results
-                embedding = await embedding_service.generate_text_embedding(cleaned_text)
-                
-                # Create resume record
-                resume = Resume(
-                    project_id=project_id,
-                    filename=file.filename,
-                    file_path=file_path,
-                    extracted_text=raw_text,  # Store original raw text
-                    parsed_sections=parsed_sections.get('raw_sections') if parsed_sections else None,
-                    parsing_method=parsing_method,
-                    embedding=embedding,  # Generated from cleaned text
-                    file_metadata={
-                        "original_filename": file.filename,
-                        "cleaned_text_length": len(cleaned_text),
-                        "raw_text_length": len(raw_text),
-                        "compression_ratio": round((len(raw_text) - len(cleaned_text)) / len(raw_text) * 100, 1)
-                    }
+                # Stream to disk in chunks, hashing as we go
+                _, content_hash = await file_storage.save_upload(
+                    file, file_path, settings.max_upload_size_mb * 1024 * 1024
                 )
-                db.add(resume)
                 
-                upload_results.append({
-                    "filename": file.filename,
-                    "status": "success",
-                    "text_length": len(raw_text),
-                    "cleaned_text_length": len(cleaned_text),
-                    "compression_ratio": round((len(raw_text) - len(cleaned_text)) / len(raw_text) * 100, 1)
-                })
+                saved_files.append((file.filename, file_path, content_hash))
                 
             except Exception as e:
                 upload_results.append({
@@ -245,6 +268,12 @@ async def upload_resumes(
                     "message": str(e)
                 })
         
+        upload_results.extend(
+            await resume_ingest_service.ingest_files(
+                project_id, saved_files, parsing_method, parsing_profile, backend, db, keywords
+            )
+        )
+        
         # Commit batch to database to prevent timeout on large uploads
         try:
             await db.commit()
@@ -267,6 +296,86 @@ async def upload_resumes(
     }
 
 
+async def ingest_archive_background(job_id: int, archive_path: str, archive_type: str):
+    """Background task to create resumes from an uploaded archive"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ProcessingJob, job_id)
+        if not job:
+            return
+        
+        try:
+            job.status = "processing"
+            job.started_at = datetime.utcnow()
+            await db.commit()
+            
+            await archive_ingest_service.ingest_archive(job.project_id, archive_path, archive_type, job, db)
+            
+            job.status = "completed"
+            job.progress = 100
+            job.completed_at = datetime.utcnow()
+            await db.commit()
+            
+        except Exception as e:
+            # Resumes from batches committed before the failure are kept
+            await db.rollback()
+            job = await db.get(ProcessingJob, job_id)
+            job.status = "failed"
+            job.error_message = str(e)
+            job.completed_at = datetime.utcnow()
+            await db.commit()
+        
+        finally:
+            os.remove(archive_path)
+
+
+@router.post("/projects/{project_id}/resumes/archive")
+async def upload_resume_archive(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload a ZIP or tar archive of resume PDFs, processed in the background"""
+    result = await db.execute(select(Project).where(Project.id == project_id))
+    project = result.scalar_one_or_none()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    archive_type = archive_format(file.filename or "")
+    if not archive_type:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported archive type. Use one of: {', '.join(ARCHIVE_FORMATS)}"
+        )
+    
+    archive_dir = os.path.join(settings.upload_dir, "archives")
+    os.makedirs(archive_dir, exist_ok=True)
+    archive_path = os.path.join(archive_dir, f"{uuid.uuid4()}.{archive_type}")
+    
+    try:
+        await file_storage.save_upload(file, archive_path, settings.max_archive_size_mb * 1024 * 1024)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    job = ProcessingJob(
+        project_id=project_id,
+        job_type="archive_upload",
+        status="pending",
+        progress=0
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    
+    background_tasks.add_task(ingest_archive_background, job.id, archive_path, archive_type)
+    
+    return {
+        "job_id": job.id,
+        "status": "started",
+        "message": f"Importing resumes from {file.filename}"
+    }
+
+
 @router.get("/projects/{project_id}/positions")
 async def get_positions(
     project_id: int,
@@ -388,6 +497,73 @@ async def get_resume_details(
     }
 
 
+async def reparse_project_background(job_id: int, force: bool):
+    """Background task to reparse every resume of a project"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ProcessingJob, job_id)
+        if not job:
+            return
+        
+        try:
+            job.status = "processing"
+            job.started_at = datetime.utcnow()
+            await db.commit()
+            
+            await resume_ingest_service.reparse_project(job.project_id, job, db, force)
+            
+            job.status = "completed"
+            job.progress = 100
+            job.completed_at = datetime.utcnow()
+            await db.commit()
+            
+        except Exception as e:
+            # Batches committed before the failure keep their new text and embeddings
+            await db.rollback()
+            job = await db.get(ProcessingJob, job_id)
+            job.status = "failed"
+            job.error_message = str(e)
+            job.completed_at = datetime.utcnow()
+            await db.commit()
+
+
+@router.post("/projects/{project_id}/resumes/reparse")
+async def reparse_project_resumes(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Reparse all resumes of a project with its current parsing configuration, in the background.
+    
+    Resumes already parsed with the same configuration are skipped unless
+    force is set, and embeddings are only regenerated for resumes whose
+    cleaned text changed.
+    """
+    result = await db.execute(select(Project).where(Project.id == project_id))
+    project = result.scalar_one_or_none()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    job = ProcessingJob(
+        project_id=project_id,
+        job_type="reparse",
+        status="pending",
+        progress=0
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    
+    background_tasks.add_task(reparse_project_background, job.id, force)
+    
+    return {
+        "job_id": job.id,
+        "status": "started",
+        "message": f"Reparsing resumes of project {project_id}"
+    }
+
+
 @router.post("/projects/{project_id}/resumes/{resume_id}/reparse")
 async def reparse_resume(
     project_id: int,
@@ -405,55 +581,25 @@ async def reparse_resume(
         raise HTTPException(status_code=404, detail="Resume not found")
     
     # Get parsing configuration
-    config_result = await db.execute(
-        select(ParsingConfiguration).where(ParsingConfiguration.project_id == project_id)
-    )
-    parsing_config = config_result.scalar_one_or_none()
-    
-    # Determine parsing method
-    parsing_method = "full_text"
-    custom_headers = None
-    if parsing_config:
-        parsing_method = parsing_config.parsing_method
-        if not parsing_config.use_default_headers and parsing_config.section_headers:
-            custom_headers = parsing_config.section_headers
+    parsing_method, parsing_profile, keywords = await resume_ingest_service.get_parsing_options(project_id, db)
+    backend = await embedding_service.get_backend(project_id, db)
     
     try:
-        # Reparse the PDF with text cleaning
-        raw_text, cleaned_text, parsed_sections = pdf_processor.extract_and_parse_pdf(
-            resume.file_path,
-            parsing_method=parsing_method,
-            custom_headers=custom_headers,
-            clean_text=True,
-            cleaning_intensity="medium"
-        )
-        
-        if not raw_text or not cleaned_text:
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF")
-        
-        # Update resume record
-        resume.extracted_text = raw_text  # Store original raw text
-        resume.parsed_sections = parsed_sections.get('raw_sections') if parsed_sections else None
-        resume.parsing_method = parsing_method
-        
-        # Update metadata with cleaning info
-        if not resume.file_metadata:
-            resume.file_metadata = {}
-        resume.file_metadata.update({
-            "cleaned_text_length": len(cleaned_text),
-            "raw_text_length": len(raw_text),
-            "compression_ratio": round((len(raw_text) - len(cleaned_text)) / len(raw_text) * 100, 1)
-        })
-        
-        # Regenerate embedding using cleaned text
-        resume.embedding = await embedding_service.generate_text_embedding(cleaned_text)
+        # Cleaning and sectioning always run again, from the cached raw text;
+        # the embedding is only regenerated if the cleaned text changed
+        reparsed = (await resume_ingest_service.reparse_resumes(
+            [resume], parsing_method, parsing_profile, keywords, backend, db, force=True
+        ))[0]
+        if reparsed["status"] == "error":
+            raise RuntimeError(reparsed["message"])
         
         await db.commit()
         
         return {
             "message": "Resume reparsed successfully",
             "parsing_method": parsing_method,
-            "has_sections": bool(resume.parsed_sections)
+            "has_sections": bool(resume.parsed_sections),
+            "reembedded": reparsed["status"] == "reembedded"
         }
         
     except Exception as e:
@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -7,9 +7,73 @@ class Settings(BaseSettings):
     ollama_host: str = "localhost:11434"
     database_url: str = "sqlite:///./data/app.db"
     upload_dir: str = "./uploads"
+    max_upload_size_mb: int = 25  # Per-file cap, enforced while the upload is streamed to disk
+    max_archive_size_mb: int = 2048  # Cap for ZIP/tar resume archives
+    archive_batch_size: int = 16  # Archive members ingested per batch
+    reparse_batch_size: int = 16  # Resumes reparsed in parallel per batch of a project reparse
     cors_origins: List[str] = ["*"]  # Allow all origins - can be restricted in production
     secret_key: str = "your-secret-key-here-change-in-production"
     
+    # SQLite pragmas run on every new connection (empty = SQLite's default)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size_mb: int = 256
+    sqlite_cache_size_mb: int = 64
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout_ms: int = 5000
+    
+    # Pooled database connections (0 = open a connection per session)
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout_seconds: float = 30.0
+    
+    # Share of SQL statements logged (0 = none, 1 = all); statements slower
+    # than sql_slow_query_ms are always logged as warnings (0 = never)
+    sql_log_sample_rate: float = 0.0
+    sql_slow_query_ms: float = 1000.0
+    
+    # Default embedding backend for new projects ('ollama' or 'local')
+    default_embedding_backend: str = "ollama"
+    ollama_embedding_model: str = "nomic-embed-text"
+    local_embedding_dimensions: int = 256
+    
+    # Text sent per embedding is packed to this share of a known model's
+    # context; other models get EMBEDDING_MAX_TOKENS at 4 chars per token
+    embedding_context_fill: float = 0.9
+    embedding_max_tokens: int = 2000
+    
+    # Background re-embedding throttle when migrating a project to a new model
+    reembed_batch_size: int = 16
+    reembed_batch_delay_seconds: float = 0.5
+    
+    # Worker processes for PDF extraction and parsing (None = CPU count, 0 = in-process threads)
+    document_workers: Optional[int] = None
+    
+    # Per-document budgets; a worker that exceeds one is killed and the file fails (0 = no limit)
+    document_task_timeout_seconds: float = 120.0
+    document_task_memory_mb: int = 1024
+    
+    # Only the leading pages of a PDF are extracted (0 = every page)
+    pdf_max_pages: int = 10
+    
+    # Text extractors tried in order, and the time allowed per document across all of them
+    pdf_extractors: List[str] = ["pypdf2", "pdftotext"]
+    pdf_extraction_budget_seconds: float = 30.0
+    
+    # Long-lived EasyOCR worker processes; scanned pages are spread across them
+    ocr_workers: int = 2
+    ocr_languages: List[str] = ["en"]
+    ocr_task_timeout_seconds: float = 120.0  # Per page
+    ocr_task_memory_mb: int = 4096
+    
+    # Pages with less extracted text than this are OCRed, first at ocr_dpi and
+    # again at ocr_escalation_dpi when the mean confidence is too low
+    ocr_min_page_chars: int = 50
+    ocr_dpi: int = 150
+    ocr_escalation_dpi: int = 300
+    ocr_min_confidence: float = 0.5
+    ocr_cache_dir: str = "./data/ocr_cache"
+    
     class Config:
         env_file = ".env"
 
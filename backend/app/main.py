@@ -4,7 +4,9 @@ from contextlib import asynccontextmanager
 import os
 
 from app.config import settings
-from app.models.database import init_db
+from app.models.database import engine, init_db
+from app.services.document_pool import document_pool
+from app.services.ocr_pool import ocr_pool
 from app.api import projects, upload, processing, results, parsing_config
 
 
@@ -16,6 +18,10 @@ async def lifespan(app: FastAPI):
     os.makedirs("data", exist_ok=True)
     await init_db()
     yield
+    document_pool.shutdown()
+    ocr_pool.shutdown()
+    # Close pooled database connections, each held open by its own thread
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -1,16 +1,17 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, LargeBinary, Index
+from sqlalchemy import create_engine, Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, LargeBinary, Index, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
 from app.config import settings
+from app.models.sqlite_profile import SQLiteProfile
 
 Base = declarative_base()
 
-engine = create_async_engine(
-    settings.database_url.replace("sqlite:///", "sqlite+aiosqlite:///"),
-    echo=True
+# Pragmas, pooling and sampled SQL logging come from the settings
+engine = SQLiteProfile.from_settings(settings).create_engine(
+    settings.database_url.replace("sqlite:///", "sqlite+aiosqlite:///")
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -26,12 +27,18 @@ class Project(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     status = Column(String, default="active")
+    embedding_backend = Column(String, default="ollama")  # 'ollama' or 'local'
+    embedding_model = Column(String)  # Model id of the vectors currently used for scoring
+    target_embedding_model = Column(String)  # Model id being migrated to, if any
     
     positions = relationship("Position", back_populates="project", cascade="all, delete-orphan")
     resumes = relationship("Resume", back_populates="project", cascade="all, delete-orphan")
     matches = relationship("Match", back_populates="project", cascade="all, delete-orphan")
     processing_jobs = relationship("ProcessingJob", back_populates="project", cascade="all, delete-orphan")
     parsing_config = relationship("ParsingConfiguration", back_populates="project", uselist=False, cascade="all, delete-orphan")
+    column_value_embeddings = relationship("ColumnValueEmbedding", back_populates="project", cascade="all, delete-orphan")
+    local_embedding_model = relationship("LocalEmbeddingModel", back_populates="project", uselist=False, cascade="all, delete-orphan")
+    staged_embeddings = relationship("StagedEmbedding", back_populates="project", cascade="all, delete-orphan")
 
 
 class Position(Base):
@@ -43,6 +50,10 @@ class Position(Base):
     embedding_columns = Column(JSON, nullable=False)
     output_columns = Column(JSON, nullable=False)
     embedding = Column(LargeBinary)
+    embedding_model = Column(String)
+    embedding_dim = Column(Integer)
+    embedding_mode = Column(String, default="concatenated")  # 'concatenated' or 'composed'
+    column_weights = Column(JSON)  # Per-column weights used in 'composed' mode
     created_at = Column(DateTime, default=datetime.utcnow)
     
     project = relationship("Project", back_populates="positions")
@@ -56,11 +67,19 @@ class Resume(Base):
     project_id = Column(Integer, ForeignKey("projects.id"))
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
+    content_hash = Column(String, index=True)  # sha256 of the PDF bytes
     extracted_text = Column(Text)
     parsed_sections = Column(JSON)  # Stores the 7 parsed sections
     parsing_method = Column(String, default="full_text")  # 'full_text' or 'section_based'
     embedding = Column(LargeBinary)
+    embedding_model = Column(String)
+    embedding_dim = Column(Integer)
     file_metadata = Column(JSON)
+    parse_config_hash = Column(String)  # Parsing options the stored text and sections were produced with
+    cleaned_text_hash = Column(String)  # sha256 of the cleaned text the embedding was generated from
+    cleaned_text = Column(LargeBinary)  # zlib-compressed cleaned text, before fitting to a token budget
+    cleaner_version = Column(String)  # CLEANER_VERSION that produced cleaned_text
+    cleaning_intensity = Column(String)  # Intensity cleaned_text was cleaned with
     created_at = Column(DateTime, default=datetime.utcnow)
     
     project = relationship("Project", back_populates="resumes")
@@ -93,9 +112,11 @@ class ProcessingJob(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
+    job_type = Column(String, default="matching")  # 'matching', 'reembed' or 'archive_upload'
     status = Column(String, nullable=False)
     progress = Column(Integer, default=0)
     error_message = Column(Text)
+    details = Column(JSON)  # Job-specific progress, e.g. per-member archive results
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     
@@ -111,12 +132,81 @@ class ParsingConfiguration(Base):
     section_headers = Column(JSON)  # Custom section header mappings
     use_default_headers = Column(Integer, default=1)  # Boolean as integer
     filter_strings = Column(JSON)  # Additional filter strings
+    high_value_keywords = Column(JSON)  # Keywords kept when compressing and truncating, replaces the defaults
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     project = relationship("Project", back_populates="parsing_config")
 
 
+class ColumnValueEmbedding(Base):
+    __tablename__ = "column_value_embeddings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    column = Column(String, nullable=False)
+    value = Column(Text, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)
+    embedding_model = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    project = relationship("Project", back_populates="column_value_embeddings")
+    
+    __table_args__ = (
+        Index('idx_column_value_project_model_column_value', 'project_id', 'embedding_model', 'column', 'value', unique=True),
+    )
+
+
+class LocalEmbeddingModel(Base):
+    __tablename__ = "local_embedding_models"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), unique=True)
+    model_data = Column(LargeBinary, nullable=False)  # Pickled fitted pipeline
+    model_id = Column(String)
+    dimension = Column(Integer)
+    document_count = Column(Integer)
+    fitted_at = Column(DateTime, default=datetime.utcnow)
+    
+    project = relationship("Project", back_populates="local_embedding_model")
+
+
+class StagedEmbedding(Base):
+    __tablename__ = "staged_embeddings"
+    
+    # Embeddings generated for a model migration, swapped in at cutover
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    item_type = Column(String, nullable=False)  # 'position' or 'resume'
+    item_id = Column(Integer, nullable=False)
+    embedding_model = Column(String, nullable=False)
+    embedding_dim = Column(Integer)
+    embedding = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    project = relationship("Project", back_populates="staged_embeddings")
+    
+    __table_args__ = (
+        Index('idx_staged_embedding_item_model', 'item_type', 'item_id', 'embedding_model', unique=True),
+    )
+
+
+class ExtractedText(Base):
+    __tablename__ = "extracted_texts"
+    
+    # Raw text extracted from a PDF, shared by every upload of the same file
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, nullable=False, unique=True)  # sha256 of the PDF bytes
+    text = Column(Text, nullable=False)
+    extractor_version = Column(String, nullable=False)
+    extractor = Column(String)  # Extractor in the chain that produced the text
+    page_count = Column(Integer)
+    pages_extracted = Column(Integer)
+    used_ocr = Column(Boolean, default=False)
+    ocr_pages = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
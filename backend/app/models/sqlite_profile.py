@@ -0,0 +1,158 @@
+import sys
+import time
+import random
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Sampled and slow SQL statements, replacing the engine's all-or-nothing echo
+sql_logger = logging.getLogger("app.sql")
+
+# Accepted values of the pragmas that take a keyword; values are interpolated
+# into the PRAGMA statement, so anything else is refused
+_KEYWORD_PRAGMAS = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+
+class SQLiteProfile:
+    """
+    Connection settings for the SQLite database, applied to every new connection.
+
+    WAL journaling lets the API keep reading while a matching or reparse job
+    writes, and synchronous=NORMAL is safe with WAL while saving an fsync per
+    commit. mmap_size and cache_size keep hot pages in memory, temp_store
+    keeps sorts and temporary indexes off disk, and busy_timeout makes a
+    second writer wait instead of failing. Connections to a database file
+    are pooled, so their page cache and pragmas outlive a request. A pragma
+    left as None keeps SQLite's default.
+
+    SQL statements are logged by sampling sql_log_sample_rate of them, and
+    every statement slower than sql_slow_query_ms is logged as a warning.
+    """
+
+    def __init__(self, journal_mode: Optional[str] = "WAL", synchronous: Optional[str] = "NORMAL",
+                 mmap_size_mb: Optional[int] = 256, cache_size_mb: Optional[int] = 64,
+                 temp_store: Optional[str] = "MEMORY", busy_timeout_ms: Optional[int] = 5000,
+                 pool_size: Optional[int] = 5, max_overflow: int = 10, pool_timeout_seconds: float = 30.0,
+                 sql_log_sample_rate: float = 0.0, sql_slow_query_ms: float = 0.0):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.mmap_size_mb = mmap_size_mb
+        self.cache_size_mb = cache_size_mb
+        self.temp_store = temp_store
+        self.busy_timeout_ms = busy_timeout_ms
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout_seconds = pool_timeout_seconds
+        self.sql_log_sample_rate = sql_log_sample_rate
+        self.sql_slow_query_ms = sql_slow_query_ms
+
+    @classmethod
+    def from_settings(cls, settings) -> "SQLiteProfile":
+        return cls(
+            journal_mode=settings.sqlite_journal_mode or None,
+            synchronous=settings.sqlite_synchronous or None,
+            mmap_size_mb=settings.sqlite_mmap_size_mb,
+            cache_size_mb=settings.sqlite_cache_size_mb,
+            temp_store=settings.sqlite_temp_store or None,
+            busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+            pool_size=settings.database_pool_size or None,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout_seconds=settings.database_pool_timeout_seconds,
+            sql_log_sample_rate=settings.sql_log_sample_rate,
+            sql_slow_query_ms=settings.sql_slow_query_ms
+        )
+
+    def pragmas(self) -> List[Tuple[str, Any]]:
+        """Get the PRAGMA statements run on every new connection, as (name, value) pairs"""
+        pragmas = [
+            ("journal_mode", self.journal_mode),
+            ("synchronous", self.synchronous),
+            ("mmap_size", self.mmap_size_mb * 1024 * 1024 if self.mmap_size_mb is not None else None),
+            # A negative cache_size is in KiB rather than pages
+            ("cache_size", -self.cache_size_mb * 1024 if self.cache_size_mb is not None else None),
+            ("temp_store", self.temp_store),
+            ("busy_timeout", self.busy_timeout_ms),
+        ]
+        checked = []
+        for name, value in pragmas:
+            if value is None:
+                continue
+            if name in _KEYWORD_PRAGMAS:
+                value = str(value).upper()
+                if value not in _KEYWORD_PRAGMAS[name]:
+                    raise ValueError(f"Invalid SQLite {name} '{value}', expected one of {sorted(_KEYWORD_PRAGMAS[name])}")
+            else:
+                value = int(value)
+            checked.append((name, value))
+        return checked
+
+    def apply_pragmas(self, dbapi_connection, connection_record=None):
+        """Run the profile's pragmas on a new DBAPI connection (a 'connect' event listener)"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    def engine_options(self, database_url: str) -> Dict[str, Any]:
+        """Get the pool options for an engine on the given database"""
+        database = make_url(database_url).database
+        if not self.pool_size or database in (None, "", ":memory:"):
+            # SQLAlchemy's own choice: no pool for files, one shared connection in memory
+            return {}
+        return {
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout_seconds,
+        }
+
+    def create_engine(self, database_url: str) -> AsyncEngine:
+        """Create an async engine with the profile's pool, pragmas and SQL logging"""
+        engine = create_async_engine(database_url, **self.engine_options(database_url))
+        if engine.dialect.name == "sqlite":
+            # Validate now rather than on the first connection
+            self.pragmas()
+            event.listen(engine.sync_engine, "connect", self.apply_pragmas)
+        if self.sql_log_sample_rate > 0 or self.sql_slow_query_ms > 0:
+            SQLStatementLogger(self.sql_log_sample_rate, self.sql_slow_query_ms).attach(engine)
+        return engine
+
+
+class SQLStatementLogger:
+    """Logs a random sample of SQL statements, and every statement slower than a threshold"""
+
+    def __init__(self, sample_rate: float = 0.0, slow_query_ms: float = 0.0):
+        self.sample_rate = sample_rate
+        self.slow_query_ms = slow_query_ms
+
+    def attach(self, engine: AsyncEngine):
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_execute)
+        if self.sample_rate > 0 and not sql_logger.handlers:
+            # Sampled statements are logged at INFO, which the root logger drops by default
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+            sql_logger.addHandler(handler)
+            sql_logger.setLevel(logging.INFO)
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start_time"] = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"]) * 1000
+        rows = f" x{len(parameters)}" if executemany else ""
+        if self.slow_query_ms and elapsed_ms >= self.slow_query_ms:
+            sql_logger.warning("Slow query (%.1f ms)%s: %s", elapsed_ms, rows, statement)
+        elif self.sample_rate and random.random() < self.sample_rate:
+            sql_logger.info("%.1f ms%s: %s", elapsed_ms, rows, statement)
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import time
+import uuid
+import logging
+import tarfile
+import zipfile
+from typing import List, Dict, Any, Iterator, Optional, Tuple, BinaryIO
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.database import ProcessingJob
+from app.services.embedding_service import embedding_service
+from app.services.file_storage import file_storage
+from app.services.resume_ingest import resume_ingest_service
+
+logger = logging.getLogger(__name__)
+
+# Least time between job progress commits while archive members are read
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+ARCHIVE_FORMATS = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar",
+    ".tgz": "tar",
+    ".tar.bz2": "tar",
+    ".tbz2": "tar",
+    ".tar.xz": "tar",
+    ".txz": "tar",
+}
+
+
+def archive_format(filename: str) -> Optional[str]:
+    """Get 'zip' or 'tar' from an archive filename, None if unsupported"""
+    lower = filename.lower()
+    for extension, archive_type in ARCHIVE_FORMATS.items():
+        if lower.endswith(extension):
+            return archive_type
+    return None
+
+
+def iter_archive_members(archive_path: str, archive_type: str) -> Iterator[Tuple[str, BinaryIO, float]]:
+    """
+    Yield (name, file object, fraction of the archive read) for each regular file.
+
+    Members are read in archive order and never extracted as a whole; tar
+    archives are opened in stream mode. Each file object is only valid until
+    the next member is requested.
+    """
+    if archive_type == "zip":
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [info for info in archive.infolist() if not info.is_dir()]
+            for index, info in enumerate(members, start=1):
+                with archive.open(info) as member:
+                    yield info.filename, member, index / len(members)
+    else:
+        archive_size = os.path.getsize(archive_path) or 1
+        with open(archive_path, "rb") as raw, tarfile.open(fileobj=raw, mode="r|*") as archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                yield info.name, archive.extractfile(info), min(1.0, raw.tell() / archive_size)
+
+
+class ArchiveIngestService:
+    """
+    Imports resumes from a ZIP or tar archive in the background.
+
+    PDF members are copied to the upload directory one at a time as the
+    archive is read, and handed to the resume ingest pipeline in batches, so
+    memory and scratch disk use do not grow with the archive size. The job
+    records the outcome of every member as it goes, committed after each
+    batch and at most every PROGRESS_INTERVAL_SECONDS while members are read.
+    """
+
+    @staticmethod
+    def _is_pdf_member(name: str) -> bool:
+        filename = os.path.basename(name)
+        # Skip resource forks that macOS adds to ZIP files
+        if name.startswith("__MACOSX/") or filename.startswith("._"):
+            return False
+        return filename.lower().endswith(".pdf")
+
+    def _next_member(self, members: Iterator[Tuple[str, BinaryIO, float]], max_bytes: int) -> Optional[Dict[str, Any]]:
+        """Read the next member and save it to the upload directory if it is a PDF (runs in a worker thread)"""
+        item = next(members, None)
+        if item is None:
+            return None
+
+        name, member, fraction = item
+        entry = {"filename": os.path.basename(name), "fraction": fraction}
+
+        if not self._is_pdf_member(name):
+            entry.update(status="skipped", message="Not a PDF file")
+            return entry
+
+        file_path = os.path.join(settings.upload_dir, f"{uuid.uuid4()}.pdf")
+        try:
+            _, content_hash = file_storage.copy_fileobj(member, file_path, max_bytes)
+            entry.update(file_path=file_path, content_hash=content_hash)
+        except Exception as e:
+            entry.update(status="error", message=str(e))
+
+        return entry
+
+    @staticmethod
+    def _details(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        members = [
+            {key: result[key] for key in ("filename", "status", "message") if key in result}
+            for result in results
+        ]
+        return {
+            "processed": len(members),
+            "succeeded": sum(1 for member in members if member["status"] == "success"),
+            "failed": sum(1 for member in members if member["status"] == "error"),
+            "skipped": sum(1 for member in members if member["status"] == "skipped"),
+            "members": members
+        }
+
+    async def ingest_archive(self, project_id: int, archive_path: str, archive_type: str,
+                             job: ProcessingJob, db: AsyncSession) -> Dict[str, Any]:
+        """Create resumes from every PDF in the archive, updating job progress as members are read"""
+        parsing_method, parsing_profile, keywords = await resume_ingest_service.get_parsing_options(project_id, db)
+        backend = await embedding_service.get_backend(project_id, db)
+
+        batch_size = max(1, settings.archive_batch_size)
+        max_bytes = settings.max_upload_size_mb * 1024 * 1024
+        loop = asyncio.get_running_loop()
+
+        members = iter_archive_members(archive_path, archive_type)
+        results = []
+        last_report = 0.0
+
+        async def report(fraction: float, force: bool = False):
+            nonlocal last_report
+            if not force and time.monotonic() - last_report < PROGRESS_INTERVAL_SECONDS:
+                return
+            job.progress = min(99, int(fraction * 100))
+            job.details = self._details(results)
+            await db.commit()
+            last_report = time.monotonic()
+
+        try:
+            finished = False
+            while not finished:
+                saved_files = []
+                fraction = 0.0
+                while len(saved_files) < batch_size:
+                    entry = await loop.run_in_executor(None, self._next_member, members, max_bytes)
+                    if entry is None:
+                        finished = True
+                        break
+
+                    fraction = entry.pop("fraction")
+                    if "file_path" in entry:
+                        saved_files.append((entry["filename"], entry["file_path"], entry["content_hash"]))
+                    else:
+                        results.append(entry)
+                    await report(fraction)
+
+                if saved_files:
+                    results.extend(
+                        await resume_ingest_service.ingest_files(
+                            project_id, saved_files, parsing_method, parsing_profile, backend, db, keywords
+                        )
+                    )
+
+                await report(fraction, force=True)
+        finally:
+            members.close()
+
+        logger.info(f"Imported {job.details['succeeded']} resumes from {archive_path} into project {project_id}")
+        return job.details
+
+
+archive_ingest_service = ArchiveIngestService()
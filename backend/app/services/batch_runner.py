@@ -0,0 +1,64 @@
+import os
+import math
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+# Chunks handed to each worker over a batch; more than one per worker evens
+# out documents of very different lengths
+CHUNKS_PER_WORKER = 4
+
+
+class DocumentResult(NamedTuple):
+    """Outcome of one document of a batch: its value, or the error that stopped it"""
+    value: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_chunk(fn: Callable, items: List[Any], options: Any) -> List[DocumentResult]:
+    """Apply fn(item, options) to each item of a chunk, capturing errors per item (runs in a worker)"""
+    results = []
+    for item in items:
+        try:
+            results.append(DocumentResult(fn(item, options)))
+        except Exception as e:
+            results.append(DocumentResult(error=f"{type(e).__name__}: {e}"))
+    return results
+
+
+def chunk_size_for(item_count: int, executor: Optional[Executor]) -> int:
+    workers = getattr(executor, "max_workers", None) or getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+    return max(1, math.ceil(item_count / (workers * CHUNKS_PER_WORKER)))
+
+
+def map_documents(fn: Callable, items: Iterable[Any], options: Any = None,
+                  executor: Optional[Executor] = None, chunk_size: Optional[int] = None) -> List[DocumentResult]:
+    """
+    Run fn(item, options) over a batch of documents, returning results in order.
+
+    fn must be a picklable top-level function when an executor is given.
+    Items are sent to the executor in chunks, so each task carries many
+    documents and every worker builds its compiled state (matchers, parser
+    profiles) once from options and reuses it. A document that raises only
+    fails itself; a chunk lost as a whole, e.g. to a worker recycled by the
+    supervised pool, fails each of its documents with that error. Without
+    an executor the batch runs in the calling thread.
+    """
+    items = list(items)
+    if executor is None:
+        return run_chunk(fn, items, options)
+
+    size = chunk_size or chunk_size_for(len(items), executor)
+    chunks = [items[start:start + size] for start in range(0, len(items), size)]
+    futures = [executor.submit(run_chunk, fn, chunk, options) for chunk in chunks]
+
+    results = []
+    for chunk, future in zip(chunks, futures):
+        try:
+            results.extend(future.result())
+        except Exception as e:
+            results.extend(DocumentResult(error=f"{type(e).__name__}: {e}") for _ in chunk)
+    return results
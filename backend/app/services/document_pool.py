@@ -0,0 +1,179 @@
+import asyncio
+import os
+import logging
+from typing import Optional, Dict, Any, Callable, List
+
+from app.config import settings
+from app.services.ocr_pool import ocr_pool
+from app.services.supervised_pool import SupervisedProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+def process_document(file_path: str, parsing_method: str = "full_text",
+                     parsing_profile: Optional[Dict[str, Any]] = None,
+                     cleaning_intensity: str = "medium",
+                     keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Validate, extract, clean and optionally section one PDF (runs in a worker process).
+
+    The PDF is parsed once; a file that cannot be parsed comes back invalid.
+    Pages without a usable text layer are not OCRed here; their numbers come
+    back in ocr_pages_needed along with the per-page text, so the caller can
+    send just those pages to the OCR worker pool.
+    """
+    from app.services.pdf_processor import pdf_processor
+
+    pages = pdf_processor.extract_pages(file_path)
+    if pages is None:
+        return {"valid": False, "ocr_pages_needed": [], "raw_text": None, "cleaned_text": None, "parsed_sections": None}
+
+    page_texts = pages["page_texts"]
+    weak_pages = pdf_processor.pages_needing_ocr(page_texts)
+    if weak_pages:
+        return {
+            "valid": True,
+            "ocr_pages_needed": weak_pages,
+            "page_texts": page_texts,
+            "extraction": pages["extraction"],
+            "raw_text": None,
+            "cleaned_text": None,
+            "parsed_sections": None
+        }
+
+    raw_text = pdf_processor.merge_page_texts(page_texts)
+    if not raw_text:
+        return {"valid": True, "ocr_pages_needed": [], "raw_text": None, "cleaned_text": None, "parsed_sections": None}
+
+    outcome = finish_document(file_path, raw_text, parsing_method, parsing_profile, cleaning_intensity, keywords)
+    outcome["extraction"] = pages["extraction"]
+    return outcome
+
+
+def finish_document(file_path: str, raw_text: str, parsing_method: str = "full_text",
+                    parsing_profile: Optional[Dict[str, Any]] = None,
+                    cleaning_intensity: str = "medium",
+                    keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Clean and optionally section already extracted text (runs in a worker process)"""
+    from app.services.pdf_processor import pdf_processor
+
+    cleaned_text, parsed_sections = pdf_processor.parse_text(
+        raw_text,
+        file_path,
+        parsing_method=parsing_method,
+        parsing_profile=parsing_profile,
+        clean_text=True,
+        cleaning_intensity=cleaning_intensity,
+        keywords=keywords
+    )
+
+    return {
+        "valid": True,
+        "ocr_pages_needed": [],
+        "raw_text": raw_text,
+        "cleaned_text": cleaned_text,
+        "parsed_sections": parsed_sections
+    }
+
+
+class DocumentWorkerPool:
+    """
+    Process pool for CPU-bound document work (PDF parsing, OCR, cleaning).
+
+    Keeps PyPDF2, EasyOCR and the regex-heavy cleaning stages off the event
+    loop. Each submitted file gets its own future, so a batch of uploads is
+    extracted in parallel across cores. Every document runs under a time and
+    memory budget; a worker that exceeds it is killed and replaced, and only
+    that file fails. With DOCUMENT_WORKERS=0 work runs in the default thread
+    pool instead of separate processes, without budgets.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self._executor: Optional[SupervisedProcessPool] = None
+
+    def _get_executor(self) -> Optional[SupervisedProcessPool]:
+        if self.max_workers <= 0:
+            return None
+
+        if self._executor is None:
+            # Spawn fresh interpreters instead of forking the running server
+            self._executor = SupervisedProcessPool(
+                self.max_workers,
+                timeout_seconds=settings.document_task_timeout_seconds,
+                memory_limit_mb=settings.document_task_memory_mb,
+                name="document"
+            )
+            logger.info(f"Started document worker pool with {self.max_workers} processes")
+
+        return self._executor
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run a picklable top-level function in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+document_pool = DocumentWorkerPool(settings.document_workers)
+
+
+async def ingest_document(file_path: str, parsing_method: str = "full_text",
+                          parsing_profile: Optional[Dict[str, Any]] = None,
+                          cleaning_intensity: str = "medium",
+                          raw_text: Optional[str] = None,
+                          keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run one PDF through the document pool, using the OCR pool for scanned pages.
+
+    When raw_text is given (e.g. from the extracted text cache) the PDF is
+    not read at all and only the cleaning and sectioning stages run.
+    keywords replaces the default high-value keywords used by the cleaner.
+    parsing_profile holds the project's custom section headers and filter
+    strings; each worker compiles it once per configuration.
+    """
+    from app.services.pdf_processor import PDFProcessor
+
+    if raw_text:
+        return await document_pool.run(
+            finish_document, file_path, raw_text, parsing_method, parsing_profile, cleaning_intensity, keywords
+        )
+
+    outcome = await document_pool.run(
+        process_document, file_path, parsing_method, parsing_profile, cleaning_intensity, keywords
+    )
+    weak_pages = outcome["ocr_pages_needed"]
+    if not weak_pages:
+        return outcome
+
+    page_texts = outcome.pop("page_texts")
+    extraction = outcome["extraction"]
+    logger.info(f"{len(weak_pages)} of {len(page_texts)} pages yielded little text, trying OCR for {file_path}")
+    try:
+        ocr_pages = await ocr_pool.ocr_pages(file_path, weak_pages)
+    except Exception as e:
+        logger.error(f"OCR extraction failed: {e}")
+        ocr_pages = {}
+
+    raw_text = PDFProcessor.merge_page_texts(page_texts, ocr_pages)
+    if not raw_text:
+        errors = [page["error"] for page in ocr_pages.values() if "error" in page]
+        if errors:
+            raise RuntimeError(f"OCR failed: {errors[0]}")
+        return {**outcome, "raw_text": None}
+
+    outcome = await document_pool.run(
+        finish_document, file_path, raw_text, parsing_method, parsing_profile, cleaning_intensity, keywords
+    )
+    outcome["extraction"] = extraction
+    # Keep per-page timings and confidence; the text itself is in raw_text
+    outcome["ocr_pages"] = [
+        {key: value for key, value in ocr_pages[page_number].items() if key != "text"}
+        for page_number in sorted(ocr_pages)
+    ]
+    return outcome
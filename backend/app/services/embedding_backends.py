@@ -0,0 +1,145 @@
+import asyncio
+import pickle
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import Normalizer
+
+from app.config import settings
+from app.services.ollama_service import ollama_service
+from app.services.token_counters import TokenCounter, model_token_budget
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend:
+    """Interface for services that turn text into embedding vectors"""
+
+    name = ""
+    model_id: Optional[str] = None  # Identifies the vector space, e.g. 'ollama:nomic-embed-text'
+
+    @property
+    def token_budget(self) -> Tuple[TokenCounter, int]:
+        """Get the token counter for the model and how many tokens of text to send it"""
+        return model_token_budget(None)
+
+    async def is_available(self) -> bool:
+        """Check if the backend can currently generate embeddings"""
+        raise NotImplementedError
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Generate embeddings for a batch of texts, None for failures"""
+        raise NotImplementedError
+
+
+class OllamaEmbeddingBackend(EmbeddingBackend):
+    """Embeddings from the local Ollama server"""
+
+    name = "ollama"
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or settings.ollama_embedding_model
+        self.model_id = f"ollama:{self.model}"
+
+    @property
+    def token_budget(self) -> Tuple[TokenCounter, int]:
+        return model_token_budget(self.model)
+
+    async def is_available(self) -> bool:
+        return await ollama_service.check_connection()
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        return await ollama_service.batch_generate_embeddings(texts, model=self.model)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    In-process embeddings using hashed TF-IDF features reduced with SVD.
+
+    The pipeline is fitted per project on its own positions and resumes, so
+    vectors from different fits are not comparable. Needs no network access.
+    """
+
+    name = "local"
+
+    def __init__(self, pipeline=None, model_id: Optional[str] = None):
+        self.pipeline = pipeline
+        self.model_id = model_id
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.pipeline is not None
+
+    @property
+    def dimension(self) -> Optional[int]:
+        if not self.is_fitted:
+            return None
+        return self.pipeline.named_steps["truncatedsvd"].n_components
+
+    async def is_available(self) -> bool:
+        return True
+
+    def fit(self, texts: List[str]) -> "LocalEmbeddingBackend":
+        """Fit the vectorizer pipeline on a project corpus"""
+        if len(texts) < 2:
+            raise ValueError("At least 2 documents are required to fit the local embedding model")
+
+        n_components = min(settings.local_embedding_dimensions, len(texts) - 1)
+        pipeline = make_pipeline(
+            HashingVectorizer(
+                n_features=2 ** 18,
+                ngram_range=(1, 2),
+                alternate_sign=False,
+                norm=None
+            ),
+            TfidfTransformer(sublinear_tf=True),
+            TruncatedSVD(n_components=n_components, random_state=42),
+            Normalizer(copy=False)
+        )
+        pipeline.fit(texts)
+
+        self.pipeline = pipeline
+        self.model_id = f"local:tfidf-svd@{datetime.utcnow():%Y%m%dT%H%M%S%f}"
+        logger.info(f"Fitted local embedding model on {len(texts)} documents ({n_components} dimensions)")
+        return self
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts in one vectorized pass"""
+        if not self.is_fitted:
+            raise ValueError("Local embedding model has not been fitted")
+        return self.pipeline.transform(texts)
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        if not self.is_fitted or not texts:
+            return [None] * len(texts)
+
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(None, self.transform, texts)
+        return [vector.tolist() for vector in vectors]
+
+    def to_bytes(self) -> bytes:
+        """Serialize the fitted pipeline for storage"""
+        return pickle.dumps(self.pipeline)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, model_id: Optional[str] = None) -> "LocalEmbeddingBackend":
+        """Restore a fitted pipeline from storage"""
+        return cls(pickle.loads(data), model_id)
+
+
+EMBEDDING_BACKENDS = ("ollama", "local")
+
+
+def backend_for_model_id(model_id: Optional[str]) -> EmbeddingBackend:
+    """Get an Ollama backend for a model id such as 'ollama:nomic-embed-text'"""
+    if model_id and model_id.startswith("ollama:"):
+        return OllamaEmbeddingBackend(model_id[len("ollama:"):])
+    return OllamaEmbeddingBackend()
+
+
+ollama_backend = OllamaEmbeddingBackend()
@@ -1,15 +1,35 @@
+import asyncio
 import numpy as np
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple, Any
 import pickle
 import logging
+import zlib
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
 
-from app.services.ollama_service import ollama_service
+from app.models.database import (
+    Project, Position, Resume, ColumnValueEmbedding, LocalEmbeddingModel, ParsingConfiguration
+)
+from app.services.embedding_backends import (
+    EmbeddingBackend, LocalEmbeddingBackend, backend_for_model_id, ollama_backend
+)
+from app.services.text_cleaner import CLEANER_VERSION, text_cleaner
 
 logger = logging.getLogger(__name__)
 
 
+class EmbeddingSpaceMismatchError(ValueError):
+    """Raised when embeddings from different models would be compared"""
+    pass
+
+
 class EmbeddingService:
     
+    def __init__(self):
+        # Fitted local models keyed by project id, with the fit timestamp
+        self._local_backends: Dict[int, Tuple[datetime, LocalEmbeddingBackend]] = {}
+    
     @staticmethod
     def serialize_embedding(embedding: List[float]) -> bytes:
         """Serialize embedding to bytes for storage"""
@@ -20,15 +40,123 @@ class EmbeddingService:
         """Deserialize embedding from bytes"""
         return pickle.loads(embedding_bytes)
     
-    async def generate_text_embedding(self, text: str) -> Optional[bytes]:
+    async def get_backend(self, project_id: int, db: AsyncSession) -> EmbeddingBackend:
+        """Get the embedding backend configured for a project"""
+        result = await db.execute(
+            select(Project.embedding_backend, Project.embedding_model).where(Project.id == project_id)
+        )
+        row = result.one_or_none()
+        
+        if not row or row.embedding_backend != "local":
+            return backend_for_model_id(row.embedding_model if row else None)
+        
+        result = await db.execute(
+            select(LocalEmbeddingModel).where(LocalEmbeddingModel.project_id == project_id)
+        )
+        stored_model = result.scalar_one_or_none()
+        if not stored_model:
+            # Not fitted yet; embeddings are generated when processing starts
+            return LocalEmbeddingBackend()
+        
+        cached = self._local_backends.get(project_id)
+        if cached and cached[0] == stored_model.fitted_at:
+            return cached[1]
+        
+        backend = LocalEmbeddingBackend.from_bytes(stored_model.model_data, stored_model.model_id)
+        self._local_backends[project_id] = (stored_model.fitted_at, backend)
+        return backend
+    
+    @staticmethod
+    def fit_to_token_budget(text: str, backend: Optional[EmbeddingBackend] = None,
+                            keywords: Optional[List[str]] = None) -> str:
+        """Truncate text to the backend model's token budget, keeping the paragraphs with the most keywords"""
+        token_counter, max_tokens = (backend or ollama_backend).token_budget
+        return text_cleaner.truncate_to_token_limit(text, max_tokens, keywords, token_counter)
+    
+    @staticmethod
+    def describe_input(text: str, original_length: int, backend: EmbeddingBackend) -> Dict[str, Any]:
+        """Summarize the text sent for an embedding, for the resume's metadata"""
+        token_counter, max_tokens = backend.token_budget
+        return {
+            "token_counter": token_counter.name,
+            "tokens": token_counter.count(text),
+            "max_tokens": max_tokens,
+            "bytes": len(text.encode("utf-8")),
+            "truncated": len(text) < original_length
+        }
+    
+    async def embed_texts(self, texts: List[str], backend: Optional[EmbeddingBackend] = None) -> List[Optional[bytes]]:
+        """Generate and serialize embeddings for a batch of texts, each fitted to the model's token budget"""
+        backend = backend or ollama_backend
+        # Counts are memoized, so texts fitted earlier are not tokenized again
+        embeddings = await backend.embed([self.fit_to_token_budget(text, backend) for text in texts])
+        return [self.serialize_embedding(embedding) if embedding else None for embedding in embeddings]
+    
+    async def generate_text_embedding(self, text: str, backend: Optional[EmbeddingBackend] = None) -> Optional[bytes]:
         """Generate and serialize embedding for text"""
-        embedding = await ollama_service.generate_embedding(text)
-        if embedding:
-            return self.serialize_embedding(embedding)
-        return None
+        embeddings = await self.embed_texts([text], backend)
+        return embeddings[0]
     
-    async def generate_position_embedding(self, position_data: dict, embedding_columns: List[str]) -> Optional[bytes]:
-        """Generate embedding for position based on selected columns"""
+    def assign_embedding(self, item: Any, embedding: Optional[bytes], backend: EmbeddingBackend):
+        """Store an embedding on a position or resume along with its model and dimension"""
+        item.embedding = embedding
+        item.embedding_model = backend.model_id if embedding else None
+        item.embedding_dim = len(self.deserialize_embedding(embedding)) if embedding else None
+    
+    @staticmethod
+    def check_same_space(items: List[Any], expected_model: Optional[str] = None):
+        """
+        Refuse to score embeddings that come from different models.
+        
+        Raises EmbeddingSpaceMismatchError listing the models found.
+        """
+        models = {item.embedding_model for item in items}
+        dims = {item.embedding_dim for item in items if item.embedding_dim}
+        if expected_model:
+            models.add(expected_model)
+        
+        if len(models) > 1 or len(dims) > 1:
+            found = ", ".join(sorted(str(model) for model in models))
+            raise EmbeddingSpaceMismatchError(
+                f"Embeddings come from different models ({found}) and cannot be compared. "
+                f"Re-embed the project with a single model first."
+            )
+    
+    @staticmethod
+    def store_cleaned_text(resume: Resume, cleaned_text: str, cleaning_intensity: str = "medium"):
+        """Keep a resume's cleaned text, compressed, so re-embedding does not clean the raw text again"""
+        resume.cleaned_text = zlib.compress(cleaned_text.encode("utf-8"))
+        resume.cleaner_version = CLEANER_VERSION
+        resume.cleaning_intensity = cleaning_intensity
+    
+    @staticmethod
+    def stored_cleaned_text(resume: Resume, cleaning_intensity: str = "medium") -> Optional[str]:
+        """Get a resume's stored cleaned text, or None if missing or cleaned differently than now"""
+        if (not resume.cleaned_text or resume.cleaner_version != CLEANER_VERSION
+                or resume.cleaning_intensity != cleaning_intensity):
+            return None
+        return zlib.decompress(resume.cleaned_text).decode("utf-8")
+    
+    def resume_text(self, resume: Resume, keywords: Optional[List[str]] = None,
+                    backend: Optional[EmbeddingBackend] = None) -> str:
+        """Get the text a resume embedding is generated from: its cleaned text, fitted to the model's token budget"""
+        # Keywords only steer aggressive cleaning, so medium-cleaned text stays valid when they change
+        cleaned_text = self.stored_cleaned_text(resume)
+        if cleaned_text is None:
+            cleaned_text = text_cleaner.clean_text(resume.extracted_text or "", intensity="medium", keywords=keywords)
+        return self.fit_to_token_budget(cleaned_text, backend, keywords)
+    
+    @staticmethod
+    async def get_high_value_keywords(project_id: int, db: AsyncSession) -> Optional[List[str]]:
+        """Get the project's own high-value keywords for the text cleaner, None to use the defaults"""
+        result = await db.execute(
+            select(ParsingConfiguration.high_value_keywords).where(ParsingConfiguration.project_id == project_id)
+        )
+        return result.scalar_one_or_none() or None
+    
+    @staticmethod
+    def build_position_text(position_data: dict, embedding_columns: List[str]) -> Optional[str]:
+        """Combine the selected position columns into a single text"""
         text_parts = []
         
         for column in embedding_columns:
@@ -36,11 +164,205 @@ class EmbeddingService:
                 text_parts.append(f"{column}: {position_data[column]}")
         
         if not text_parts:
+            return None
+        
+        return "\n".join(text_parts)
+    
+    async def generate_position_embedding(
+        self,
+        position_data: dict,
+        embedding_columns: List[str],
+        backend: Optional[EmbeddingBackend] = None
+    ) -> Optional[bytes]:
+        """Generate embedding for position based on selected columns"""
+        combined_text = self.build_position_text(position_data, embedding_columns)
+        
+        if not combined_text:
             logger.warning("No valid columns found for embedding generation")
             return None
             
-        combined_text = "\n".join(text_parts)
-        return await self.generate_text_embedding(combined_text)
+        return await self.generate_text_embedding(combined_text, backend)
+    
+    async def get_column_value_embeddings(
+        self,
+        project_id: int,
+        positions_data: List[dict],
+        embedding_columns: List[str],
+        db: AsyncSession,
+        backend: Optional[EmbeddingBackend] = None
+    ) -> Dict[Tuple[str, str], np.ndarray]:
+        """
+        Get embeddings for every distinct (column, value) pair in the positions.
+        
+        Pairs already cached for the project are loaded from the database, so
+        only values that have never been seen are sent to the embedding model.
+        """
+        wanted = set()
+        for position_data in positions_data:
+            for column in embedding_columns:
+                if column in position_data and position_data[column]:
+                    wanted.add((column, str(position_data[column])))
+        
+        backend = backend or ollama_backend
+        result = await db.execute(
+            select(ColumnValueEmbedding).where(
+                ColumnValueEmbedding.project_id == project_id,
+                ColumnValueEmbedding.embedding_model == backend.model_id
+            )
+        )
+        column_vectors = {}
+        for cached in result.scalars().all():
+            if (cached.column, cached.value) in wanted:
+                column_vectors[(cached.column, cached.value)] = self.deserialize_embedding(cached.embedding)
+        
+        missing = [pair for pair in wanted if pair not in column_vectors]
+        logger.info(
+            f"Column value embeddings: {len(wanted)} distinct values, "
+            f"{len(wanted) - len(missing)} cached, {len(missing)} to embed"
+        )
+        
+        embeddings = await backend.embed([f"{column}: {value}" for column, value in missing])
+        
+        for (column, value), embedding in zip(missing, embeddings):
+            if not embedding:
+                logger.warning(f"Could not embed value for column '{column}'")
+                continue
+            
+            serialized = self.serialize_embedding(embedding)
+            db.add(ColumnValueEmbedding(
+                project_id=project_id,
+                column=column,
+                value=value,
+                embedding=serialized,
+                embedding_model=backend.model_id
+            ))
+            column_vectors[(column, value)] = np.array(embedding)
+        
+        return column_vectors
+    
+    def compose_position_embedding(
+        self,
+        position_data: dict,
+        embedding_columns: List[str],
+        column_vectors: Dict[Tuple[str, str], np.ndarray],
+        column_weights: Optional[Dict[str, float]] = None
+    ) -> Optional[bytes]:
+        """
+        Build a position embedding as a weighted combination of its column vectors.
+        
+        Each column vector is normalized first so that long free-text columns
+        do not dominate short categorical ones; columns without a weight get 1.0.
+        """
+        column_weights = column_weights or {}
+        combined = None
+        
+        for column in embedding_columns:
+            if column not in position_data or not position_data[column]:
+                continue
+            
+            vector = column_vectors.get((column, str(position_data[column])))
+            weight = float(column_weights.get(column, 1.0))
+            if vector is None or weight == 0:
+                continue
+            
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                continue
+            
+            weighted = vector * (weight / norm)
+            combined = weighted if combined is None else combined + weighted
+        
+        if combined is None:
+            logger.warning("No valid columns found for composed embedding")
+            return None
+        
+        norm = np.linalg.norm(combined)
+        if norm > 0:
+            combined = combined / norm
+        
+        return self.serialize_embedding(combined)
+    
+    async def fit_local_backend(self, project_id: int, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Fit the project's local embedding model and re-embed all its data.
+        
+        Every fit produces a new vector space, so all positions, resumes and
+        cached column values are re-embedded with the new model in one go.
+        """
+        positions_result = await db.execute(select(Position).where(Position.project_id == project_id))
+        positions = positions_result.scalars().all()
+        resumes_result = await db.execute(select(Resume).where(Resume.project_id == project_id))
+        resumes = resumes_result.scalars().all()
+        
+        position_texts = [
+            self.build_position_text(position.original_data, position.embedding_columns) or ""
+            for position in positions
+        ]
+        keywords = await self.get_high_value_keywords(project_id, db)
+        resume_texts = [self.resume_text(resume, keywords, LocalEmbeddingBackend()) for resume in resumes]
+        
+        loop = asyncio.get_running_loop()
+        backend = await loop.run_in_executor(
+            None, LocalEmbeddingBackend().fit, position_texts + resume_texts
+        )
+        
+        # Store the fitted model, replacing any previous fit
+        fitted_at = datetime.utcnow()
+        await db.execute(delete(LocalEmbeddingModel).where(LocalEmbeddingModel.project_id == project_id))
+        db.add(LocalEmbeddingModel(
+            project_id=project_id,
+            model_data=backend.to_bytes(),
+            model_id=backend.model_id,
+            dimension=backend.dimension,
+            document_count=len(position_texts) + len(resume_texts),
+            fitted_at=fitted_at
+        ))
+        self._local_backends[project_id] = (fitted_at, backend)
+        
+        project = await db.get(Project, project_id)
+        project.embedding_model = backend.model_id
+        
+        # Cached column values belong to the old vector space
+        await db.execute(delete(ColumnValueEmbedding).where(ColumnValueEmbedding.project_id == project_id))
+        
+        for resume, embedding in zip(resumes, await self.embed_texts(resume_texts, backend)):
+            self.assign_embedding(resume, embedding, backend)
+        
+        composed = [position for position in positions if position.embedding_mode == "composed"]
+        concatenated = [position for position in positions if position.embedding_mode != "composed"]
+        
+        concatenated_texts = [
+            self.build_position_text(position.original_data, position.embedding_columns)
+            for position in concatenated
+        ]
+        concatenated_embeddings = await self.embed_texts([text or "" for text in concatenated_texts], backend)
+        for position, text, embedding in zip(concatenated, concatenated_texts, concatenated_embeddings):
+            self.assign_embedding(position, embedding if text else None, backend)
+        
+        if composed:
+            column_vectors = await self.get_column_value_embeddings(
+                project_id,
+                [position.original_data for position in composed],
+                composed[0].embedding_columns,
+                db,
+                backend
+            )
+            for position in composed:
+                embedding = self.compose_position_embedding(
+                    position.original_data,
+                    position.embedding_columns,
+                    column_vectors,
+                    position.column_weights
+                )
+                self.assign_embedding(position, embedding, backend)
+        
+        await db.commit()
+        
+        return {
+            "dimension": backend.dimension,
+            "positions_embedded": len(positions),
+            "resumes_embedded": len(resumes)
+        }
     
     def calculate_similarity(self, embedding1_bytes: bytes, embedding2_bytes: bytes) -> float:
         """Calculate cosine similarity between two embeddings"""
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.models.database import ExtractedText
+from app.services.pdf_extractors import pages_to_extract
+from app.services.pdf_processor import EXTRACTOR_VERSION
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ExtractionCache:
+    """
+    Content-addressed store of raw text extracted from PDFs.
+
+    Entries are keyed by the sha256 of the PDF bytes, so the same file
+    uploaded to several projects or reparsed with a new configuration is only
+    extracted (and OCRed) once. Entries from an older extractor version, or
+    extracted under a different max-pages budget, are ignored and overwritten.
+    """
+
+    @staticmethod
+    def _hash_file_sync(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    async def hash_file(self, file_path: str) -> str:
+        """Hash a stored PDF without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._hash_file_sync, file_path)
+
+    async def get_many(self, content_hashes: List[str], db: AsyncSession) -> Dict[str, ExtractedText]:
+        """Get current cache entries for the given hashes"""
+        if not content_hashes:
+            return {}
+
+        result = await db.execute(
+            select(ExtractedText).where(
+                ExtractedText.content_hash.in_(set(content_hashes)),
+                ExtractedText.extractor_version == EXTRACTOR_VERSION
+            )
+        )
+        return {
+            entry.content_hash: entry
+            for entry in result.scalars().all()
+            if entry.pages_extracted == pages_to_extract(entry.page_count or 0)
+        }
+
+    async def get(self, content_hash: str, db: AsyncSession) -> Optional[ExtractedText]:
+        """Get the current cache entry for one hash"""
+        return (await self.get_many([content_hash], db)).get(content_hash)
+
+    async def put(self, content_hash: str, outcome: Dict[str, Any], db: AsyncSession):
+        """Store the raw text of an ingest outcome, replacing any stale entry"""
+        # Text missing pages whose OCR failed is not worth keeping
+        if not outcome.get("raw_text") or any("error" in page for page in outcome.get("ocr_pages") or []):
+            return
+
+        extraction = outcome.get("extraction") or {}
+        values = {
+            "text": outcome["raw_text"],
+            "extractor_version": EXTRACTOR_VERSION,
+            "extractor": extraction.get("extractor"),
+            "page_count": extraction.get("page_count"),
+            "pages_extracted": extraction.get("pages_extracted"),
+            "used_ocr": bool(outcome.get("ocr_pages")),
+            "ocr_pages": outcome.get("ocr_pages")
+        }
+        statement = insert(ExtractedText).values(content_hash=content_hash, **values)
+        await db.execute(
+            statement.on_conflict_do_update(index_elements=[ExtractedText.content_hash], set_=values)
+        )
+
+    @staticmethod
+    def restore(entry: ExtractedText, outcome: Dict[str, Any]):
+        """Fill an ingest outcome's extraction details from a cache entry"""
+        outcome["extraction"] = {
+            "extractor": entry.extractor,
+            "page_count": entry.page_count,
+            "pages_extracted": entry.pages_extracted,
+            "cached": True
+        }
+        outcome["ocr_pages"] = entry.ocr_pages
+
+
+extraction_cache = ExtractionCache()
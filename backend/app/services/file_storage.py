@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import os
+import logging
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload is bigger than the configured size cap"""
+
+
+def _too_large(max_bytes: int) -> FileTooLargeError:
+    return FileTooLargeError(f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+
+
+class FileStorage:
+    """
+    Writes uploaded files to disk without blocking the event loop.
+
+    Uploads are copied in fixed-size chunks, with disk writes run in the
+    default thread pool, so only one chunk is held in memory at a time.
+    """
+
+    async def save_upload(self, upload: UploadFile, file_path: str,
+                          max_bytes: Optional[int] = None) -> Tuple[int, str]:
+        """
+        Stream an upload to file_path and return its size and sha256.
+
+        Raises FileTooLargeError as soon as more than max_bytes have been read.
+        The partial file is removed if the copy fails for any reason.
+        """
+        if max_bytes and upload.size is not None and upload.size > max_bytes:
+            raise _too_large(max_bytes)
+
+        loop = asyncio.get_running_loop()
+        digest = hashlib.sha256()
+        size = 0
+
+        f = await loop.run_in_executor(None, open, file_path, "wb")
+        try:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise _too_large(max_bytes)
+
+                digest.update(chunk)
+                await loop.run_in_executor(None, f.write, chunk)
+
+            await loop.run_in_executor(None, f.close)
+        except BaseException:
+            await loop.run_in_executor(None, f.close)
+            await loop.run_in_executor(None, os.remove, file_path)
+            raise
+
+        return size, digest.hexdigest()
+
+    def copy_fileobj(self, source: BinaryIO, file_path: str,
+                     max_bytes: Optional[int] = None) -> Tuple[int, str]:
+        """
+        Blocking chunked copy of a readable file object, e.g. an archive member.
+
+        Same size cap, hashing and cleanup as save_upload; call it from a
+        worker thread.
+        """
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            with open(file_path, "wb") as f:
+                while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if max_bytes and size > max_bytes:
+                        raise _too_large(max_bytes)
+
+                    digest.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+
+        return size, digest.hexdigest()
+
+
+file_storage = FileStorage()
@@ -0,0 +1,71 @@
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from fuzzywuzzy import fuzz
+
+from app.services.keyword_matcher import _trie_pattern
+
+# Verdicts remembered per index; sections are filtered twice per resume and
+# boilerplate lines recur across resumes
+MATCH_CACHE_SIZE = 4096
+
+
+class FilterIndex:
+    """
+    Decides which lines match a list of filter strings, built once per list.
+
+    A line matches a filter string when either contains the other or their
+    fuzz.ratio is at least the threshold, all compared in uppercase. The
+    containment checks are one regex search and one substring search over
+    all filters, and only filters whose length allows the threshold to be
+    reached are scored with fuzz.ratio.
+    """
+
+    def __init__(self, filter_strings: Iterable[str], threshold: int = 85):
+        self.filter_strings: List[str] = [filter_string for filter_string in filter_strings if filter_string]
+        self.threshold = threshold
+
+        upper = [filter_string.upper() for filter_string in self.filter_strings]
+        self._originals = {}
+        for upper_filter, filter_string in zip(upper, self.filter_strings):
+            self._originals.setdefault(upper_filter, filter_string)
+        self._contains_filter = re.compile(_trie_pattern(sorted(self._originals))) if upper else None
+        # Lines never contain '\n', so a line is inside some filter exactly when it is inside the joined list
+        self._joined = "\n".join(upper)
+
+        # Filters sorted by length, for picking the ones a line's length can reach the threshold with
+        by_length = sorted(zip(upper, self.filter_strings), key=lambda item: len(item[0]))
+        self._lengths = [len(upper_filter) for upper_filter, _ in by_length]
+        self._by_length: List[Tuple[str, str]] = by_length
+
+        # fuzz.ratio is 2 * matches / total length, and matches can be no more
+        # than the shorter length; half a point is allowed for rounding
+        best_ratio = (threshold - 0.5) / 100
+        self._length_factor = best_ratio / (2 - best_ratio)
+
+        self.match = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match)
+
+    def _match(self, line: str) -> Optional[Tuple[str, int]]:
+        """Get a filter string matching the stripped line and its similarity, or None"""
+        if self._contains_filter is None or not line:
+            return None
+        line_upper = line.upper()
+
+        found = self._contains_filter.search(line_upper)
+        if found:
+            upper_filter = found.group(0)
+            return self._originals[upper_filter], fuzz.ratio(line_upper, upper_filter)
+        if line_upper in self._joined:
+            upper_filter = next(upper_filter for upper_filter in self._originals if line_upper in upper_filter)
+            return self._originals[upper_filter], fuzz.ratio(line_upper, upper_filter)
+
+        length = len(line_upper)
+        low = bisect_left(self._lengths, length * self._length_factor)
+        high = bisect_right(self._lengths, length / self._length_factor)
+        for upper_filter, filter_string in self._by_length[low:high]:
+            similarity = fuzz.ratio(line_upper, upper_filter)
+            if similarity >= self.threshold:
+                return filter_string, similarity
+        return None
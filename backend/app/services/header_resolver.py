@@ -0,0 +1,70 @@
+import json
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from fuzzywuzzy import fuzz
+
+# Resolutions remembered per resolver; the same few hundred headers recur
+# across every resume of a project
+RESOLUTION_CACHE_SIZE = 4096
+
+# Minimum fuzz.ratio for a header to match a target section; skills need
+# an exact match or very high similarity
+SKILLS_THRESHOLD = 90
+DEFAULT_THRESHOLD = 70
+
+
+class HeaderResolver:
+    """
+    Scores detected section headers against the headers of each target section.
+
+    A header is scored against every target section once, and the result is
+    kept in a bounded LRU cache shared by all documents parsed with the same
+    target sections. A resolver is built per target section mapping, so
+    changed headers get a new resolver and a fresh cache.
+    """
+
+    def __init__(self, target_sections: Dict[str, List[str]]):
+        self.target_sections = target_sections
+        self._targets: List[Tuple[str, int, List[str]]] = [
+            (
+                target_section,
+                SKILLS_THRESHOLD if target_section == 'skills' else DEFAULT_THRESHOLD,
+                [target_header.upper() for target_header in target_headers]
+            )
+            for target_section, target_headers in target_sections.items()
+        ]
+        self.scores = lru_cache(maxsize=RESOLUTION_CACHE_SIZE)(self._scores)
+
+    def _scores(self, section_header: str) -> Tuple[Tuple[str, int], ...]:
+        """Get the best score of the header for each target section it matches, in target order"""
+        header_upper = section_header.upper()
+        scores = []
+        for target_section, threshold, target_headers in self._targets:
+            best_score = max((fuzz.ratio(header_upper, target_header) for target_header in target_headers), default=0)
+            if best_score >= threshold:
+                scores.append((target_section, best_score))
+        return tuple(scores)
+
+    def best_target(self, section_header: str) -> Optional[str]:
+        """Find which target section this header matches best, the first listed on a tie"""
+        best_match = None
+        best_score = 0
+        for target_section, score in self.scores(section_header):
+            if score > best_score:
+                best_match = target_section
+                best_score = score
+        return best_match
+
+    def clear(self):
+        self.scores.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def _cached_resolver(target_sections_key: str) -> HeaderResolver:
+    return HeaderResolver(json.loads(target_sections_key))
+
+
+def header_resolver(target_sections: Dict[str, List[str]]) -> HeaderResolver:
+    """Get the resolver for a target section mapping, building it on first use"""
+    return _cached_resolver(json.dumps(target_sections))
@@ -0,0 +1,75 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Build a regex alternation that shares common prefixes, trying longer keywords first"""
+    trie: Dict[str, Dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        group = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A keyword ends here; the greedy optional still prefers a longer one
+            return "(?:" + group + ")?"
+        return group
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur in a text in a single pass.
+
+    All keywords are compiled into one prefix-sharing regex, so a text is
+    scanned once whatever the number of keywords, instead of once per
+    keyword. Matching is case-insensitive substring matching, the same as
+    `keyword in text.lower()`.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(sorted({keyword.lower() for keyword in keywords if keyword}))
+        self._pattern = re.compile(f"(?=({_trie_pattern(list(self.keywords))}))") if self.keywords else None
+
+        # The scan reports the longest keyword starting at each position;
+        # every keyword inside it occurs in the text as well
+        self._contained: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(other for other in self.keywords if other in keyword)
+            for keyword in self.keywords
+        }
+
+    def found(self, text: str) -> Set[str]:
+        """Get the keywords that occur in the text"""
+        if self._pattern is None or not text:
+            return set()
+        longest = {match.group(1) for match in self._pattern.finditer(text.lower())}
+        found = set()
+        for keyword in longest:
+            found |= self._contained[keyword]
+        return found
+
+    def count(self, text: str) -> int:
+        """Get how many different keywords occur in the text"""
+        return len(self.found(text))
+
+    def contains_any(self, text: str) -> bool:
+        """Check if at least one keyword occurs in the text, stopping at the first"""
+        return self._pattern is not None and bool(text) and self._pattern.search(text.lower()) is not None
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def keyword_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """Get the compiled matcher for a keyword list, building it on first use"""
+    return _cached_matcher(tuple(keywords))
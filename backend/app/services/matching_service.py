@@ -4,7 +4,7 @@ from sqlalchemy import select, delete
 import logging
 
 from app.models.database import Project, Position, Resume, Match
-from app.services.embedding_service import embedding_service
+from app.services.embedding_service import embedding_service, EmbeddingSpaceMismatchError
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +37,13 @@ class MatchingService:
                     "message": "No positions or resumes with embeddings found"
                 }
             
+            # Never score across different embedding models
+            project = await db.get(Project, project_id)
+            embedding_service.check_same_space(
+                list(positions) + list(resumes),
+                project.embedding_model if project else None
+            )
+            
             # Delete existing matches for this project
             await db.execute(
                 delete(Match).where(Match.project_id == project_id)
@@ -85,6 +92,13 @@ class MatchingService:
                 "matches_created": matches_created
             }
             
+        except EmbeddingSpaceMismatchError as e:
+            logger.error(f"Refusing to calculate matches for project {project_id}: {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+            
         except Exception as e:
             logger.error(f"Error calculating matches: {e}")
             await db.rollback()
@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.config import settings
+from app.services.supervised_pool import SupervisedProcessPool
+
+logger = logging.getLogger(__name__)
+
+# EasyOCR reader held by each OCR worker process for its whole lifetime
+_reader = None
+
+
+def _init_ocr_worker(languages: List[str]):
+    """Build the EasyOCR reader once when the worker process starts"""
+    global _reader
+    import easyocr
+
+    _reader = easyocr.Reader(languages, gpu=False)
+
+
+def _cached_ocr(cache_dir: str, page_hash: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(cache_dir, f"{page_hash}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_ocr(cache_dir: str, page_hash: str, result: Dict[str, Any]):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{page_hash}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+
+
+def ocr_page(file_path: str, page_number: int, dpi_levels: List[int],
+             min_confidence: float, cache_dir: str) -> Dict[str, Any]:
+    """
+    Rasterize a single page, OCR it and discard the image (runs in an OCR worker).
+
+    The page is tried at each DPI in turn, moving to the next one only when
+    the mean OCR confidence is below min_confidence, and the most confident
+    result across the DPIs tried is returned. OCR results are cached by a
+    hash of the rendered pixels, so an identical page is never OCRed twice.
+    """
+    import numpy as np
+    import pdf2image
+
+    timing = {"page": page_number, "rasterize_seconds": 0.0, "ocr_seconds": 0.0, "cached": False}
+    best = {"text": "", "confidence": 0.0}
+
+    for dpi in dpi_levels:
+        start = time.perf_counter()
+        images = pdf2image.convert_from_path(file_path, dpi=dpi, first_page=page_number, last_page=page_number)
+        page_array = np.array(images[0]) if images else None
+        del images
+        timing["rasterize_seconds"] += time.perf_counter() - start
+
+        if page_array is None:
+            break
+
+        page_hash = hashlib.sha256(page_array.tobytes()).hexdigest()
+        cached = _cached_ocr(cache_dir, page_hash)
+        if cached is not None:
+            result = cached
+            timing["cached"] = True
+        else:
+            start = time.perf_counter()
+            ocr_results = _reader.readtext(page_array)
+            timing["ocr_seconds"] += time.perf_counter() - start
+
+            result = {
+                "text": " ".join(ocr_result[1] for ocr_result in ocr_results),
+                "confidence": round(sum(r[2] for r in ocr_results) / len(ocr_results), 3) if ocr_results else 0.0
+            }
+            _store_ocr(cache_dir, page_hash, result)
+        del page_array
+
+        # A higher DPI is not always read better, so keep whichever was most confident
+        if "dpi" not in timing or result["confidence"] > best["confidence"]:
+            best = result
+            timing["dpi"] = dpi
+        if best["confidence"] >= min_confidence:
+            break
+
+    timing["rasterize_seconds"] = round(timing["rasterize_seconds"], 3)
+    timing["ocr_seconds"] = round(timing["ocr_seconds"], 3)
+    return {**timing, **best}
+
+
+class OCRWorkerPool:
+    """
+    Dedicated long-lived processes for OCR.
+
+    Each worker loads the EasyOCR model once and keeps it warm. Pages are
+    submitted as single-page tasks spread across the workers, and each task
+    rasterizes only its own page, so memory stays bounded by one page per
+    worker no matter how long the document is. A page that runs past its time
+    or memory budget fails on its own and its worker is replaced.
+    """
+
+    def __init__(self, max_workers: int = 2, languages: Optional[List[str]] = None):
+        self.max_workers = max(1, max_workers)
+        self.languages = languages or ["en"]
+        self._executor: Optional[SupervisedProcessPool] = None
+
+    def _get_executor(self) -> SupervisedProcessPool:
+        if self._executor is None:
+            self._executor = SupervisedProcessPool(
+                self.max_workers,
+                initializer=_init_ocr_worker,
+                initargs=(self.languages,),
+                timeout_seconds=settings.ocr_task_timeout_seconds,
+                memory_limit_mb=settings.ocr_task_memory_mb,
+                name="ocr"
+            )
+            logger.info(f"Started OCR worker pool with {self.max_workers} processes")
+
+        return self._executor
+
+    def _page_args(self) -> Tuple[List[int], float, str]:
+        dpi_levels = [settings.ocr_dpi]
+        if settings.ocr_escalation_dpi and settings.ocr_escalation_dpi > settings.ocr_dpi:
+            dpi_levels.append(settings.ocr_escalation_dpi)
+        return dpi_levels, settings.ocr_min_confidence, settings.ocr_cache_dir
+
+    @staticmethod
+    def _by_page(page_numbers: List[int], pages: List[Any]) -> Dict[int, Dict[str, Any]]:
+        """Key page results by page number, recording failed pages with their error"""
+        by_page = {}
+        for page_number, page in zip(page_numbers, pages):
+            if isinstance(page, Exception):
+                logger.error(f"OCR failed on page {page_number}: {page}")
+                page = {"page": page_number, "error": str(page)}
+            by_page[page_number] = page
+        return by_page
+
+    def ocr_pages_sync(self, file_path: str, page_numbers: List[int]) -> Dict[int, Dict[str, Any]]:
+        """OCR the given 1-based pages, blocking until all are done"""
+        executor = self._get_executor()
+        futures = [
+            executor.submit(ocr_page, file_path, page_number, *self._page_args())
+            for page_number in page_numbers
+        ]
+        return self._by_page(page_numbers, [future.exception() or future.result() for future in futures])
+
+    async def ocr_pages(self, file_path: str, page_numbers: List[int]) -> Dict[int, Dict[str, Any]]:
+        """OCR the given 1-based pages with one future per page"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        pages = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, ocr_page, file_path, page_number, *self._page_args())
+                for page_number in page_numbers
+            ),
+            return_exceptions=True
+        )
+
+        by_page = self._by_page(page_numbers, pages)
+        logger.info(
+            f"OCR finished for {file_path}: {len(pages)} pages "
+            f"({sum(1 for page in by_page.values() if page.get('cached'))} cached), "
+            f"{sum(page.get('ocr_seconds', 0) for page in by_page.values()):.1f}s OCR time across workers"
+        )
+        return by_page
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+ocr_pool = OCRWorkerPool(settings.ocr_workers, settings.ocr_languages)
@@ -1,4 +1,5 @@
 import httpx
+import json
 import asyncio
 from typing import List, Optional
 import logging
@@ -11,8 +12,12 @@ logger = logging.getLogger(__name__)
 class OllamaService:
     def __init__(self):
         self.base_url = f"http://{settings.ollama_host}"
-        self.model = "nomic-embed-text"
+        self.model = settings.ollama_embedding_model
         self.client = httpx.AsyncClient(timeout=30.0)
+        
+        # Request bodies sent for embeddings since startup
+        self.embedding_requests = 0
+        self.embedding_bytes_sent = 0
     
     async def check_connection(self) -> bool:
         """Check if Ollama service is available"""
@@ -23,16 +28,20 @@ class OllamaService:
             logger.error(f"Failed to connect to Ollama: {e}")
             return False
     
-    async def generate_embedding(self, text: str, retries: int = 3) -> Optional[List[float]]:
+    async def generate_embedding(self, text: str, retries: int = 3, model: Optional[str] = None) -> Optional[List[float]]:
         """Generate embedding for given text with retry logic"""
+        payload = json.dumps({"model": model or self.model, "prompt": text}).encode("utf-8")
+        
         for attempt in range(retries):
             try:
+                self.embedding_requests += 1
+                self.embedding_bytes_sent += len(payload)
+                logger.debug(f"Embedding request: {len(payload)} bytes ({len(text)} chars)")
+                
                 response = await self.client.post(
                     f"{self.base_url}/api/embeddings",
-                    json={
-                        "model": self.model,
-                        "prompt": text
-                    }
+                    content=payload,
+                    headers={"Content-Type": "application/json"}
                 )
                 
                 if response.status_code == 200:
@@ -48,12 +57,12 @@ class OllamaService:
                     
         return None
     
-    async def batch_generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+    async def batch_generate_embeddings(self, texts: List[str], model: Optional[str] = None) -> List[Optional[List[float]]]:
         """Generate embeddings for multiple texts"""
         embeddings = []
         
         for text in texts:
-            embedding = await self.generate_embedding(text)
+            embedding = await self.generate_embedding(text, model=model)
             embeddings.append(embedding)
             
         return embeddings
@@ -0,0 +1,196 @@
+import re
+import math
+import time
+import shutil
+import logging
+import subprocess
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import PyPDF2
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionTimeout(Exception):
+    """Raised when an extractor runs past the document's time budget"""
+
+
+def pages_to_extract(page_count: int, max_pages: Optional[int] = None) -> int:
+    """Get how many leading pages are extracted under the max-pages budget"""
+    max_pages = settings.pdf_max_pages if max_pages is None else max_pages
+    return min(page_count, max_pages) if max_pages > 0 else page_count
+
+
+def pages_needing_ocr(page_texts: List[str]) -> List[int]:
+    """Get the 1-based numbers of pages whose extracted text is too short to be real content"""
+    return [
+        page_number
+        for page_number, page_text in enumerate(page_texts, start=1)
+        if len(page_text.strip()) < settings.ocr_min_page_chars
+    ]
+
+
+class PDFExtractor:
+    """Interface for engines that pull the text layer out of a PDF"""
+
+    name = ""
+
+    def is_available(self) -> bool:
+        """Check if the engine can run in this environment"""
+        return True
+
+    def extract(self, file_path: str, max_pages: Optional[int], deadline: float) -> Tuple[List[str], int]:
+        """Extract text from the leading pages, returning per-page text and the total page count"""
+        raise NotImplementedError
+
+
+class PyPDF2Extractor(PDFExtractor):
+    """Pure-Python extraction with PyPDF2, parsing the file once"""
+
+    name = "pypdf2"
+
+    def iter_page_texts(self, reader: PyPDF2.PdfReader, page_limit: int, deadline: float) -> Iterator[str]:
+        """Lazily extract text page by page from an already parsed PDF"""
+        for page_num in range(page_limit):
+            if time.perf_counter() > deadline:
+                raise ExtractionTimeout(f"Time budget exhausted after {page_num} pages")
+            try:
+                yield reader.pages[page_num].extract_text() or ""
+            except Exception as e:
+                logger.error(f"PyPDF2 extraction failed on page {page_num + 1}: {e}")
+                yield ""
+
+    def extract(self, file_path: str, max_pages: Optional[int], deadline: float) -> Tuple[List[str], int]:
+        pdf_reader = PyPDF2.PdfReader(file_path)
+        page_count = len(pdf_reader.pages)
+        page_limit = pages_to_extract(page_count, max_pages)
+        return list(self.iter_page_texts(pdf_reader, page_limit, deadline)), page_count
+
+
+class PdftotextExtractor(PDFExtractor):
+    """Poppler's pdftotext command, installed alongside pdf2image"""
+
+    name = "pdftotext"
+
+    def is_available(self) -> bool:
+        return shutil.which("pdftotext") is not None and shutil.which("pdfinfo") is not None
+
+    @staticmethod
+    def _run(args: List[str], deadline: float) -> bytes:
+        timeout = None if math.isinf(deadline) else deadline - time.perf_counter()
+        if timeout is not None and timeout <= 0:
+            raise ExtractionTimeout("Time budget exhausted")
+        try:
+            return subprocess.run(args, capture_output=True, check=True, timeout=timeout).stdout
+        except subprocess.TimeoutExpired:
+            raise ExtractionTimeout(f"{args[0]} exceeded the time budget")
+
+    def extract(self, file_path: str, max_pages: Optional[int], deadline: float) -> Tuple[List[str], int]:
+        info = self._run(["pdfinfo", file_path], deadline).decode("utf-8", errors="replace")
+        match = re.search(r"^Pages:\s+(\d+)", info, re.MULTILINE)
+        if not match:
+            raise ValueError("pdfinfo did not report a page count")
+        page_count = int(match.group(1))
+
+        page_limit = pages_to_extract(page_count, max_pages)
+        if page_limit == 0:
+            return [], page_count
+
+        output = self._run(
+            ["pdftotext", "-enc", "UTF-8", "-f", "1", "-l", str(page_limit), file_path, "-"],
+            deadline
+        ).decode("utf-8", errors="replace")
+
+        # Pages are separated by form feeds
+        page_texts = output.split("\f")[:page_limit]
+        page_texts += [""] * (page_limit - len(page_texts))
+        return page_texts, page_count
+
+
+PDF_EXTRACTORS: Dict[str, PDFExtractor] = {
+    extractor.name: extractor
+    for extractor in (PyPDF2Extractor(), PdftotextExtractor())
+}
+
+
+class ExtractorChain:
+    """
+    Tries the configured extractors in order within a per-document time budget.
+
+    The first extractor that yields usable text on every page wins. Otherwise
+    the attempt with the fewest text-less pages is kept, so as few pages as
+    possible are sent to OCR. Every attempt is recorded with its timing.
+    """
+
+    def __init__(self, names: Optional[List[str]] = None, budget_seconds: Optional[float] = None):
+        self.names = names if names is not None else settings.pdf_extractors
+        self.budget_seconds = budget_seconds if budget_seconds is not None else settings.pdf_extraction_budget_seconds
+
+    @property
+    def extractors(self) -> List[PDFExtractor]:
+        extractors = []
+        for name in self.names:
+            extractor = PDF_EXTRACTORS.get(name)
+            if extractor is None:
+                logger.warning(f"Unknown PDF extractor '{name}', skipping")
+            elif extractor.is_available():
+                extractors.append(extractor)
+        return extractors
+
+    def extract(self, file_path: str, max_pages: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Extract per-page text with the first extractor that succeeds.
+
+        Returns None when no extractor could read the file.
+        """
+        start = time.perf_counter()
+        deadline = start + self.budget_seconds
+        attempts = []
+        best = None
+
+        for extractor in self.extractors:
+            if time.perf_counter() >= deadline:
+                break
+
+            attempt_start = time.perf_counter()
+            try:
+                page_texts, page_count = extractor.extract(file_path, max_pages, deadline)
+            except Exception as e:
+                attempts.append({
+                    "extractor": extractor.name,
+                    "seconds": round(time.perf_counter() - attempt_start, 3),
+                    "error": str(e) or type(e).__name__
+                })
+                logger.warning(f"{extractor.name} could not extract {file_path}: {e}")
+                continue
+
+            weak_pages = len(pages_needing_ocr(page_texts))
+            attempts.append({
+                "extractor": extractor.name,
+                "seconds": round(time.perf_counter() - attempt_start, 3),
+                "pages_extracted": len(page_texts),
+                "characters": sum(len(page_text) for page_text in page_texts),
+                "pages_without_text": weak_pages
+            })
+
+            if best is None or weak_pages < best[0]:
+                best = (weak_pages, extractor.name, page_texts, page_count)
+            if weak_pages == 0:
+                break
+
+        if best is None:
+            return None
+
+        _, extractor_name, page_texts, page_count = best
+        return {
+            "page_texts": page_texts,
+            "extraction": {
+                "extractor": extractor_name,
+                "page_count": page_count,
+                "pages_extracted": len(page_texts),
+                "extract_seconds": round(time.perf_counter() - start, 3),
+                "attempts": attempts
+            }
+        }
@@ -1,47 +1,60 @@
 import os
 import logging
-from typing import Optional, Dict, Any, Tuple
-import PyPDF2
-import easyocr
-import numpy as np
-from PIL import Image
-import io
-import tempfile
+from typing import Optional, Dict, Any, List, Tuple
 
+from app.services.ocr_pool import ocr_pool
+from app.services.pdf_extractors import ExtractorChain, pages_needing_ocr
 from app.services.section_parser import section_parser
 from app.services.text_cleaner import text_cleaner
 
 logger = logging.getLogger(__name__)
 
+# Bump when extraction output changes so cached texts are extracted again
+EXTRACTOR_VERSION = "extractor-chain-1"
+
 
 class PDFProcessor:
-    def __init__(self):
-        self.ocr_reader = None
-        
-    def _init_ocr(self):
-        """Lazy initialization of EasyOCR reader"""
-        if self.ocr_reader is None:
-            self.ocr_reader = easyocr.Reader(['en'])
     
-    def extract_text_from_pdf(self, file_path: str) -> Optional[str]:
-        """Extract text from PDF, using OCR as fallback"""
+    @staticmethod
+    def pages_needing_ocr(page_texts: List[str]) -> List[int]:
+        """Get the 1-based numbers of pages whose extracted text is too short to be real content"""
+        return pages_needing_ocr(page_texts)
+    
+    @staticmethod
+    def merge_page_texts(page_texts: List[str], ocr_pages: Optional[Dict[int, Dict[str, Any]]] = None) -> Optional[str]:
+        """Join per-page text, using OCR output for pages where it found more text"""
+        ocr_pages = ocr_pages or {}
+        text = ""
+        for page_number, page_text in enumerate(page_texts, start=1):
+            ocr_text = ocr_pages.get(page_number, {}).get("text", "")
+            if len(ocr_text.strip()) > len(page_text.strip()):
+                page_text = ocr_text
+            if page_text:
+                text += page_text + "\n"
+        return text.strip() or None
+    
+    def extract_text_from_pdf(self, file_path: str, allow_ocr: bool = True) -> Optional[str]:
+        """Extract text from PDF, OCRing only the pages that have no usable text layer"""
         try:
-            # First try PyPDF2
-            text = self._extract_with_pypdf2(file_path)
+            pages = self.extract_pages(file_path)
+            if pages is None:
+                return None
+            page_texts = pages["page_texts"]
             
-            # If text is too short or empty, try OCR
-            if not text or len(text.strip()) < 50:
-                logger.info(f"PDF text extraction yielded little content, trying OCR for {file_path}")
-                text = self._extract_with_ocr(file_path)
+            ocr_pages = {}
+            weak_pages = self.pages_needing_ocr(page_texts)
+            if allow_ocr and weak_pages:
+                logger.info(f"{len(weak_pages)} of {len(page_texts)} pages yielded little text, trying OCR for {file_path}")
+                ocr_pages = self._extract_with_ocr(file_path, weak_pages)
                 
-            return text.strip() if text else None
+            return self.merge_page_texts(page_texts, ocr_pages)
             
         except Exception as e:
             logger.error(f"Error processing PDF {file_path}: {e}")
             return None
     
     def extract_and_parse_pdf(self, file_path: str, parsing_method: str = "full_text", 
-                            custom_headers: Optional[Dict[str, Any]] = None,
+                            parsing_profile: Optional[Dict[str, Any]] = None,
                             clean_text: bool = True, cleaning_intensity: str = "medium") -> Tuple[Optional[str], Optional[str], Optional[Dict[str, Any]]]:
         """Extract text, clean it, and optionally parse into sections"""
         try:
@@ -50,101 +63,80 @@ class PDFProcessor:
             if not raw_text:
                 return None, None, None
             
-            # Clean and optimize text for embedding
-            cleaned_text = None
-            if clean_text:
-                cleaned_text = text_cleaner.clean_and_optimize(
-                    raw_text, 
-                    intensity=cleaning_intensity,
-                    max_tokens=2000
-                )
-                logger.info(f"Text cleaning: {len(raw_text)} -> {len(cleaned_text)} chars")
-            else:
-                cleaned_text = raw_text
-            
-            # If section-based parsing is requested
-            if parsing_method == "section_based":
-                # Extract filename from path
-                filename = os.path.basename(file_path)
-                
-                # Parse into sections using cleaned text for better results
-                parsed_sections = section_parser.parse_resume(
-                    cleaned_text, 
-                    filename=filename,
-                    return_raw_sections=True
-                )
-                
-                # If custom headers provided, override defaults
-                if custom_headers and parsed_sections and 'raw_sections' in parsed_sections:
-                    # TODO: Apply custom header mappings
-                    pass
-                
-                return raw_text, cleaned_text, parsed_sections
-            else:
-                # Just return raw and cleaned text
-                return raw_text, cleaned_text, None
+            cleaned_text, parsed_sections = self.parse_text(
+                raw_text, file_path, parsing_method, parsing_profile, clean_text, cleaning_intensity
+            )
+            return raw_text, cleaned_text, parsed_sections
                 
         except Exception as e:
             logger.error(f"Error in extract_and_parse_pdf for {file_path}: {e}")
             return None, None, None
     
-    def _extract_with_pypdf2(self, file_path: str) -> str:
-        """Extract text using PyPDF2"""
-        text = ""
+    def parse_text(self, raw_text: str, file_path: str, parsing_method: str = "full_text",
+                   parsing_profile: Optional[Dict[str, Any]] = None,
+                   clean_text: bool = True, cleaning_intensity: str = "medium",
+                   keywords: Optional[List[str]] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Clean already extracted text and optionally parse it into sections"""
+        # Clean and optimize text for embedding
+        cleaned_text = None
+        if clean_text:
+            # Truncation to the embedding model's token budget happens when embedding
+            cleaned_text = text_cleaner.clean_text(
+                raw_text, 
+                intensity=cleaning_intensity,
+                keywords=keywords
+            )
+            logger.debug("Text cleaning: %d -> %d chars", len(raw_text), len(cleaned_text))
+        else:
+            cleaned_text = raw_text
         
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                        
-        except Exception as e:
-            logger.error(f"PyPDF2 extraction failed: {e}")
+        # If section-based parsing is requested
+        if parsing_method == "section_based":
+            # Extract filename from path
+            filename = os.path.basename(file_path)
             
-        return text
+            # Parse into sections using cleaned text for better results, with the
+            # project's custom headers and filter strings compiled once per configuration
+            parsed_sections = section_parser.parse_resume(
+                cleaned_text, 
+                filename=filename,
+                return_raw_sections=True,
+                profile=section_parser.get_profile(parsing_profile)
+            )
+            
+            return cleaned_text, parsed_sections
+        else:
+            # Just return the cleaned text
+            return cleaned_text, None
+    
+    def extract_pages(self, file_path: str, max_pages: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Extract per-page text from the leading pages with the configured extractor chain.
+        
+        Returns None when the file is not a readable PDF, so no separate
+        validation pass is needed. Only the first max_pages pages
+        (PDF_MAX_PAGES by default) are extracted.
+        """
+        return ExtractorChain().extract(file_path, max_pages)
     
-    def _extract_with_ocr(self, file_path: str) -> str:
-        """Extract text using EasyOCR (for image-based PDFs)"""
+    def _extract_with_ocr(self, file_path: str, page_numbers: List[int]) -> Dict[int, Dict[str, Any]]:
+        """OCR the given pages using the EasyOCR worker pool (for image-based pages)"""
         try:
-            self._init_ocr()
-            text = ""
-            
-            # Convert PDF pages to images
-            import pdf2image
-            
-            pages = pdf2image.convert_from_path(file_path, dpi=200)
-            
-            for i, page in enumerate(pages):
-                logger.info(f"Processing page {i+1} with OCR...")
-                
-                # Convert PIL Image to numpy array
-                page_array = np.array(page)
-                
-                # Run OCR
-                results = self.ocr_reader.readtext(page_array)
-                
-                # Extract text from results
-                page_text = " ".join([result[1] for result in results])
-                text += page_text + "\n"
-                
-            return text
+            ocr_pages = ocr_pool.ocr_pages_sync(file_path, page_numbers)
+            for page in ocr_pages.values():
+                if "error" in page:
+                    continue
+                logger.info(
+                    f"OCR page {page['page']}: {'cached' if page['cached'] else 'ocr'} at {page.get('dpi')} dpi, "
+                    f"confidence {page['confidence']}, rasterize {page['rasterize_seconds']}s, "
+                    f"ocr {page['ocr_seconds']}s"
+                )
+            return ocr_pages
             
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}")
-            return ""
-    
-    def validate_pdf(self, file_path: str) -> bool:
-        """Validate if file is a valid PDF"""
-        try:
-            with open(file_path, 'rb') as file:
-                PyPDF2.PdfReader(file)
-            return True
-        except:
-            return False
+            return {}
+
 
 
 pdf_processor = PDFProcessor()
\ No newline at end of file
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+
+from app.config import settings
+from app.models.database import Project, Position, Resume, ColumnValueEmbedding, ProcessingJob, StagedEmbedding
+from app.services.embedding_backends import backend_for_model_id
+from app.services.embedding_service import embedding_service
+
+logger = logging.getLogger(__name__)
+
+
+class ReembeddingService:
+    """
+    Migrates a project's embeddings to a new model in the background.
+
+    New vectors are written to staged_embeddings in small throttled batches
+    while the current vectors keep serving matches. Once every position and
+    resume has a staged vector, they are swapped in a single transaction.
+    """
+
+    async def _unstaged_items(self, project_id: int, target_model: str, db: AsyncSession) -> Tuple[List[Position], List[Resume]]:
+        """Get positions and resumes that have no staged embedding for the target model"""
+        staged_result = await db.execute(
+            select(StagedEmbedding.item_type, StagedEmbedding.item_id).where(
+                StagedEmbedding.project_id == project_id,
+                StagedEmbedding.embedding_model == target_model
+            )
+        )
+        staged = set(staged_result.all())
+
+        positions_result = await db.execute(select(Position).where(Position.project_id == project_id))
+        resumes_result = await db.execute(select(Resume).where(Resume.project_id == project_id))
+
+        positions = [p for p in positions_result.scalars().all() if ("position", p.id) not in staged]
+        resumes = [r for r in resumes_result.scalars().all() if ("resume", r.id) not in staged]
+        return positions, resumes
+
+    def _stage(self, project_id: int, item_type: str, item_id: int, embedding: Optional[bytes], target_model: str, db: AsyncSession):
+        # Items with nothing to embed are staged without a vector, so they count as done
+        db.add(StagedEmbedding(
+            project_id=project_id,
+            item_type=item_type,
+            item_id=item_id,
+            embedding_model=target_model,
+            embedding_dim=len(embedding_service.deserialize_embedding(embedding)) if embedding else None,
+            embedding=embedding
+        ))
+
+    async def _stage_batch(self, project_id: int, items: List[Any], target_model: str, db: AsyncSession) -> int:
+        """Embed and stage one batch of positions and resumes"""
+        backend = backend_for_model_id(target_model)
+
+        composed = [item for item in items if isinstance(item, Position) and item.embedding_mode == "composed"]
+        plain = [item for item in items if item not in composed]
+
+        keywords = await embedding_service.get_high_value_keywords(project_id, db)
+        texts = []
+        for item in plain:
+            if isinstance(item, Position):
+                texts.append(embedding_service.build_position_text(item.original_data, item.embedding_columns) or "")
+            else:
+                texts.append(embedding_service.resume_text(item, keywords, backend))
+
+        embeddings = await embedding_service.embed_texts(texts, backend)
+        for item, text, embedding in zip(plain, texts, embeddings):
+            if text and not embedding:
+                raise RuntimeError(f"Could not generate {target_model} embedding for {type(item).__name__.lower()} {item.id}")
+            item_type = "position" if isinstance(item, Position) else "resume"
+            self._stage(project_id, item_type, item.id, embedding, target_model, db)
+
+        if composed:
+            column_vectors = await embedding_service.get_column_value_embeddings(
+                project_id,
+                [position.original_data for position in composed],
+                composed[0].embedding_columns,
+                db,
+                backend
+            )
+            for position in composed:
+                embedding = embedding_service.compose_position_embedding(
+                    position.original_data,
+                    position.embedding_columns,
+                    column_vectors,
+                    position.column_weights
+                )
+                self._stage(project_id, "position", position.id, embedding, target_model, db)
+
+        return len(items)
+
+    async def _cutover(self, project_id: int, target_model: str, db: AsyncSession) -> int:
+        """Swap the staged embeddings in and make the target model current"""
+        staged_result = await db.execute(
+            select(StagedEmbedding).where(
+                StagedEmbedding.project_id == project_id,
+                StagedEmbedding.embedding_model == target_model
+            )
+        )
+        staged = {(row.item_type, row.item_id): row for row in staged_result.scalars().all()}
+
+        positions_result = await db.execute(select(Position).where(Position.project_id == project_id))
+        resumes_result = await db.execute(select(Resume).where(Resume.project_id == project_id))
+
+        swapped = 0
+        for item_type, items in (("position", positions_result.scalars().all()), ("resume", resumes_result.scalars().all())):
+            for item in items:
+                row = staged.get((item_type, item.id))
+                embedding = row.embedding if row else None
+                item.embedding = embedding
+                item.embedding_model = target_model if embedding else None
+                item.embedding_dim = row.embedding_dim if embedding else None
+                swapped += 1 if embedding else 0
+
+        await db.execute(delete(StagedEmbedding).where(StagedEmbedding.project_id == project_id))
+        await db.execute(
+            delete(ColumnValueEmbedding).where(
+                ColumnValueEmbedding.project_id == project_id,
+                ColumnValueEmbedding.embedding_model != target_model
+            )
+        )
+
+        project = await db.get(Project, project_id)
+        project.embedding_model = target_model
+        project.target_embedding_model = None
+
+        await db.commit()
+        return swapped
+
+    async def reembed_project(self, project_id: int, target_model: str, job: ProcessingJob, db: AsyncSession) -> Dict[str, Any]:
+        """Re-embed all project data with the target model, then cut over"""
+        batch_size = max(1, settings.reembed_batch_size)
+        processed = 0
+        attempted = set()
+
+        # Keep going until nothing is left, so items uploaded during the
+        # migration are picked up before the cutover
+        while True:
+            positions, resumes = await self._unstaged_items(project_id, target_model, db)
+            pending = positions + resumes
+            if not pending:
+                break
+
+            # Every staged item leaves the pending list; one that comes back was never staged
+            keys = {(type(item).__name__, item.id) for item in pending}
+            if keys <= attempted:
+                raise RuntimeError(f"Re-embedding made no progress with {len(pending)} items left")
+            attempted |= keys
+
+            total = processed + len(pending)
+            for batch_start in range(0, len(pending), batch_size):
+                batch = pending[batch_start:batch_start + batch_size]
+                processed += await self._stage_batch(project_id, batch, target_model, db)
+
+                job.progress = min(99, int(processed / total * 100))
+                await db.commit()
+
+                # Throttle so the embedding backend keeps serving other requests
+                await asyncio.sleep(settings.reembed_batch_delay_seconds)
+
+        swapped = await self._cutover(project_id, target_model, db)
+        logger.info(f"Project {project_id} cut over to {target_model} ({swapped} embeddings)")
+
+        return {
+            "status": "success",
+            "embedding_model": target_model,
+            "embeddings_swapped": swapped
+        }
+
+
+reembedding_service = ReembeddingService()
@@ -0,0 +1,378 @@
+import asyncio
+import os
+import json
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.database import Resume, ParsingConfiguration, ProcessingJob
+from app.services.document_pool import ingest_document
+from app.services.embedding_backends import EmbeddingBackend
+from app.services.embedding_service import embedding_service
+from app.services.extraction_cache import extraction_cache
+from app.services.section_parser import section_parser
+from app.services.text_cleaner import CLEANER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeIngestService:
+    """Turns PDFs saved to the upload directory into resume records"""
+
+    async def get_parsing_options(self, project_id: int, db: AsyncSession) -> Tuple[str, Optional[Dict[str, Any]], Optional[List[str]]]:
+        """
+        Get the parsing method, parser profile options and high-value keywords from the project's parsing configuration.
+
+        The profile options (custom section headers and filter strings) are
+        compiled into matchers by the section parser once per configuration.
+        """
+        config_result = await db.execute(
+            select(ParsingConfiguration).where(ParsingConfiguration.project_id == project_id)
+        )
+        parsing_config = config_result.scalar_one_or_none()
+
+        parsing_method = "full_text"
+        parsing_profile = None
+        keywords = None
+        if parsing_config:
+            keywords = parsing_config.high_value_keywords or None
+            parsing_method = parsing_config.parsing_method
+            if parsing_config.section_headers or parsing_config.filter_strings:
+                parsing_profile = {
+                    "project_id": project_id,
+                    "section_headers": parsing_config.section_headers,
+                    "use_default_headers": bool(parsing_config.use_default_headers),
+                    "filter_strings": parsing_config.filter_strings
+                }
+
+        return parsing_method, parsing_profile, keywords
+
+    @staticmethod
+    def parse_config_hash(parsing_method: str, parsing_profile: Optional[Dict[str, Any]],
+                          keywords: Optional[List[str]], cleaning_intensity: str = "medium") -> str:
+        """Hash the options that cleaning and sectioning depend on, including the global filter strings"""
+        profile = {key: value for key, value in (parsing_profile or {}).items() if key != "project_id"}
+        filter_strings = section_parser.current_filter_strings() if parsing_method == "section_based" else None
+        config = json.dumps(
+            [parsing_method, profile, keywords, cleaning_intensity, CLEANER_VERSION, filter_strings], sort_keys=True
+        )
+        return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    async def ingest_files(self, project_id: int, saved_files: List[Tuple[str, str, str]],
+                           parsing_method: str, parsing_profile: Optional[Dict[str, Any]],
+                           backend: EmbeddingBackend, db: AsyncSession,
+                           keywords: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract, clean, embed and add resume records for a batch of saved PDFs.
+
+        saved_files holds (filename, file_path, content_hash) tuples. Files are
+        processed in parallel by the document pool; the caller commits.
+        Returns one result per file, in order.
+        """
+        results = []
+        config_hash = self.parse_config_hash(parsing_method, parsing_profile, keywords)
+
+        # Files seen before (in any project) skip extraction and OCR
+        cached_texts = await extraction_cache.get_many([content_hash for _, _, content_hash in saved_files], db)
+
+        # Validate, extract, clean and section all files of the batch in parallel
+        outcomes = await asyncio.gather(
+            *(
+                ingest_document(
+                    file_path, parsing_method, parsing_profile, "medium",
+                    cached_texts[content_hash].text if content_hash in cached_texts else None,
+                    keywords
+                )
+                for _, file_path, content_hash in saved_files
+            ),
+            return_exceptions=True
+        )
+
+        for (filename, file_path, content_hash), outcome in zip(saved_files, outcomes):
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+
+                cached = cached_texts.get(content_hash)
+                if cached:
+                    extraction_cache.restore(cached, outcome)
+                else:
+                    await extraction_cache.put(content_hash, outcome, db)
+
+                if not outcome["valid"]:
+                    os.remove(file_path)
+                    results.append({
+                        "filename": filename,
+                        "status": "error",
+                        "message": "Invalid PDF file"
+                    })
+                    continue
+
+                raw_text = outcome["raw_text"]
+                cleaned_text = outcome["cleaned_text"]
+                parsed_sections = outcome["parsed_sections"]
+
+                if not raw_text or not cleaned_text:
+                    os.remove(file_path)
+                    results.append({
+                        "filename": filename,
+                        "status": "error",
+                        "message": "Could not extract text from PDF"
+                    })
+                    continue
+
+                # Generate embedding using cleaned text for better results, fitted to the model's token budget
+                embedding_text = embedding_service.fit_to_token_budget(cleaned_text, backend, keywords)
+                embedding = await embedding_service.generate_text_embedding(embedding_text, backend)
+
+                # Create resume record
+                resume = Resume(
+                    project_id=project_id,
+                    filename=filename,
+                    file_path=file_path,
+                    content_hash=content_hash,
+                    extracted_text=raw_text,  # Store original raw text
+                    parsed_sections=parsed_sections.get('raw_sections') if parsed_sections else None,
+                    parsing_method=parsing_method,
+                    parse_config_hash=config_hash,
+                    cleaned_text_hash=self.text_hash(embedding_text) if embedding else None,
+                    file_metadata={
+                        "original_filename": filename,
+                        "cleaned_text_length": len(cleaned_text),
+                        "raw_text_length": len(raw_text),
+                        "compression_ratio": round((len(raw_text) - len(cleaned_text)) / len(raw_text) * 100, 1),
+                        "extraction": outcome.get("extraction"),
+                        "ocr_pages": outcome.get("ocr_pages"),
+                        "embedding_input": (
+                            embedding_service.describe_input(embedding_text, len(cleaned_text), backend)
+                            if embedding else None
+                        )
+                    }
+                )
+                # Embedding is generated from cleaned text, kept for re-embedding
+                embedding_service.assign_embedding(resume, embedding, backend)
+                embedding_service.store_cleaned_text(resume, cleaned_text)
+                db.add(resume)
+
+                results.append({
+                    "filename": filename,
+                    "status": "success",
+                    "text_length": len(raw_text),
+                    "cleaned_text_length": len(cleaned_text),
+                    "compression_ratio": round((len(raw_text) - len(cleaned_text)) / len(raw_text) * 100, 1),
+                    "embedded": embedding is not None
+                })
+
+            except Exception as e:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                results.append({
+                    "filename": filename,
+                    "status": "error",
+                    "message": str(e)
+                })
+
+        return results
+
+    async def reparse_resumes(self, resumes: List[Resume], parsing_method: str,
+                              parsing_profile: Optional[Dict[str, Any]], keywords: Optional[List[str]],
+                              backend: EmbeddingBackend, db: AsyncSession, force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Bring a batch of resumes up to date with the project's parsing options and embedding model.
+
+        Only stages whose inputs changed run again. A resume parsed with the
+        same options from the same raw text, whose embedding is from the
+        backend's model, is left as is unless force is set; if only its
+        embedding is missing or stale, it is re-embedded from its stored
+        cleaned text. Cleaning and sectioning reuse the cached raw text and run
+        in parallel in the document pool; the embedding is only regenerated
+        when the cleaned text differs from the one it was made from, or it is
+        missing or from another model. The caller commits. Returns one result
+        per resume, in order.
+        """
+        config_hash = self.parse_config_hash(parsing_method, parsing_profile, keywords)
+
+        results: Dict[int, Dict[str, Any]] = {}
+
+        # Resumes stored before content hashing are hashed now; a missing file only fails its own resume
+        hashed = []
+        for resume in resumes:
+            try:
+                if not resume.content_hash:
+                    resume.content_hash = await extraction_cache.hash_file(resume.file_path)
+                hashed.append(resume)
+            except Exception as e:
+                results[resume.id] = {"resume_id": resume.id, "filename": resume.filename,
+                                      "status": "error", "message": str(e)}
+        cached_texts = await extraction_cache.get_many([resume.content_hash for resume in hashed], db)
+
+        stale_embeddings = []
+        pending = []
+        for resume in hashed:
+            cached = cached_texts.get(resume.content_hash)
+            parse_current = (resume.parse_config_hash == config_hash
+                             and cached is not None and cached.text == resume.extracted_text)
+            embedding_current = bool(resume.embedding) and resume.embedding_model == backend.model_id
+            if force or not parse_current:
+                pending.append(resume)
+            elif embedding_current:
+                results[resume.id] = {"resume_id": resume.id, "filename": resume.filename, "status": "unchanged"}
+            elif embedding_service.stored_cleaned_text(resume) is not None:
+                stale_embeddings.append(resume)
+            else:
+                pending.append(resume)
+
+        # Re-embed resumes whose text is current straight from their stored cleaned text
+        embedding_texts = [embedding_service.resume_text(resume, keywords, backend) for resume in stale_embeddings]
+        try:
+            embeddings = await embedding_service.embed_texts(embedding_texts, backend)
+        except Exception:
+            # Embed one at a time so that only the resumes the backend fails on get an error
+            embeddings = []
+            for resume, embedding_text in zip(stale_embeddings, embedding_texts):
+                try:
+                    embeddings.append(await embedding_service.generate_text_embedding(embedding_text, backend))
+                except Exception as e:
+                    embeddings.append(e)
+        for resume, embedding_text, embedding in zip(stale_embeddings, embedding_texts, embeddings):
+            if isinstance(embedding, Exception):
+                results[resume.id] = {"resume_id": resume.id, "filename": resume.filename,
+                                      "status": "error", "message": str(embedding)}
+                continue
+            embedding_service.assign_embedding(resume, embedding, backend)
+            resume.cleaned_text_hash = self.text_hash(embedding_text) if embedding else None
+            cleaned_text_length = (resume.file_metadata or {}).get("cleaned_text_length") or len(embedding_text)
+            resume.file_metadata = {
+                **(resume.file_metadata or {}),
+                "embedding_input": (
+                    embedding_service.describe_input(embedding_text, cleaned_text_length, backend) if embedding else None
+                )
+            }
+            results[resume.id] = {"resume_id": resume.id, "filename": resume.filename, "status": "reembedded"}
+
+        # Clean and section the rest in parallel, extracting only files missing from the cache
+        outcomes = await asyncio.gather(
+            *(
+                ingest_document(
+                    resume.file_path, parsing_method, parsing_profile, "medium",
+                    cached_texts[resume.content_hash].text if resume.content_hash in cached_texts else None,
+                    keywords
+                )
+                for resume in pending
+            ),
+            return_exceptions=True
+        )
+
+        for resume, outcome in zip(pending, outcomes):
+            result = {"resume_id": resume.id, "filename": resume.filename}
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+
+                cached = cached_texts.get(resume.content_hash)
+                if cached:
+                    extraction_cache.restore(cached, outcome)
+                else:
+                    await extraction_cache.put(resume.content_hash, outcome, db)
+
+                raw_text = outcome["raw_text"]
+                cleaned_text = outcome["cleaned_text"]
+                parsed_sections = outcome["parsed_sections"]
+                if not raw_text or not cleaned_text:
+                    raise ValueError("Could not extract text from PDF")
+
+                resume.extracted_text = raw_text  # Store original raw text
+                resume.parsed_sections = parsed_sections.get('raw_sections') if parsed_sections else None
+                resume.parsing_method = parsing_method
+                resume.parse_config_hash = config_hash
+                embedding_service.store_cleaned_text(resume, cleaned_text)
+
+                # Reassign so the JSON column is saved as changed
+                file_metadata = {
+                    **(resume.file_metadata or {}),
+                    "cleaned_text_length": len(cleaned_text),
+                    "raw_text_length": len(raw_text),
+                    "compression_ratio": round((len(raw_text) - len(cleaned_text)) / len(raw_text) * 100, 1),
+                    "extraction": outcome.get("extraction"),
+                    "ocr_pages": outcome.get("ocr_pages")
+                }
+
+                # Re-embed only when the text sent to the model changed, or the embedding is stale
+                embedding_text = embedding_service.fit_to_token_budget(cleaned_text, backend, keywords)
+                embedding_hash = self.text_hash(embedding_text)
+                if (embedding_hash == resume.cleaned_text_hash and resume.embedding
+                        and resume.embedding_model == backend.model_id):
+                    result["status"] = "reparsed"
+                else:
+                    embedding = await embedding_service.generate_text_embedding(embedding_text, backend)
+                    embedding_service.assign_embedding(resume, embedding, backend)
+                    resume.cleaned_text_hash = embedding_hash if embedding else None
+                    file_metadata["embedding_input"] = (
+                        embedding_service.describe_input(embedding_text, len(cleaned_text), backend) if embedding else None
+                    )
+                    result["status"] = "reembedded"
+                resume.file_metadata = file_metadata
+
+            except Exception as e:
+                result.update(status="error", message=str(e))
+
+            results[resume.id] = result
+
+        return [results[resume.id] for resume in resumes]
+
+    @staticmethod
+    def _reparse_details(results: List[Dict[str, Any]], total: int) -> Dict[str, Any]:
+        return {
+            "total": total,
+            "processed": len(results),
+            **{
+                status: sum(1 for result in results if result["status"] == status)
+                for status in ("unchanged", "reparsed", "reembedded")
+            },
+            "failed": sum(1 for result in results if result["status"] == "error"),
+            "resumes": results
+        }
+
+    async def reparse_project(self, project_id: int, job: ProcessingJob, db: AsyncSession,
+                              force: bool = False) -> Dict[str, Any]:
+        """Reparse every resume of a project in parallel batches, updating job progress per batch"""
+        parsing_method, parsing_profile, keywords = await self.get_parsing_options(project_id, db)
+        backend = await embedding_service.get_backend(project_id, db)
+
+        resume_ids = (await db.execute(
+            select(Resume.id).where(Resume.project_id == project_id).order_by(Resume.id)
+        )).scalars().all()
+
+        batch_size = max(1, settings.reparse_batch_size)
+        results = []
+        for batch_start in range(0, len(resume_ids), batch_size):
+            batch_ids = resume_ids[batch_start:batch_start + batch_size]
+            resumes = (await db.execute(
+                select(Resume).where(Resume.id.in_(batch_ids)).order_by(Resume.id)
+            )).scalars().all()
+
+            results.extend(
+                await self.reparse_resumes(resumes, parsing_method, parsing_profile, keywords, backend, db, force)
+            )
+
+            job.progress = min(99, int(len(results) / len(resume_ids) * 100))
+            job.details = self._reparse_details(results, len(resume_ids))
+            await db.commit()
+
+        details = self._reparse_details(results, len(resume_ids))
+        logger.info(
+            f"Reparsed project {project_id}: {details['unchanged']} unchanged, {details['reparsed']} reparsed, "
+            f"{details['reembedded']} re-embedded, {details['failed']} failed"
+        )
+        return details
+
+
+resume_ingest_service = ResumeIngestService()
@@ -3,14 +3,96 @@ Raw Section-Based Resume Parser with Fuzzy Matching
 Parses resumes by looking for uppercase section titles and using fuzzy matching
 """
 import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from datetime import datetime
 from fuzzywuzzy import fuzz
 import logging
 
+from app.services.batch_runner import DocumentResult, map_documents
+from app.services.filter_index import FilterIndex
+from app.services.header_resolver import header_resolver
+from app.services.skill_matcher import skill_matcher
+
 logger = logging.getLogger(__name__)
 
+# Uppercase lines that could be section headers, and headers followed by
+# a delimiter such as "SKILLS:" or "EXPERIENCE -"
+_SECTION_HEADER_PATTERN = re.compile(r'^[A-Z][A-Z\s&/\-:()]{2,50}$')
+_DELIMITED_HEADER_PATTERN = re.compile(r'^([A-Z][A-Z\s&/\-()]{2,30})[:\-]')
+
+_NON_WORD_CHARS = re.compile(r'[^\w]')
+_REPEATED_NAME_MARKERS = re.compile(r'\[NAME_REMOVED\](\s*\[NAME_REMOVED\])+')
+_WHITESPACE_RUNS = re.compile(r'\s+')
+
+# Compiled parser profiles kept, one per project configuration in use
+PROFILE_CACHE_SIZE = 32
+
+
+class ParserProfile:
+    """
+    A project's parsing settings compiled into matchers: the target sections
+    with their header resolver, and the global plus project filter strings.
+    """
+
+    def __init__(self, target_sections: Dict[str, List[str]], filter_strings: List[str]):
+        self.target_sections = target_sections
+        self.header_resolver = header_resolver(target_sections)
+        self.filter_index = FilterIndex(filter_strings)
+
+
+class ParseContext:
+    """
+    Per-document state shared by the section cleaners of one parse_resume call.
+
+    The person's name variants are taken from the filename, and their
+    patterns compiled, once per document instead of once per section. Each
+    detected header is resolved to its scores against the target sections
+    once, instead of once per target section.
+    """
+
+    def __init__(self, filename: str, potential_names: List[str],
+                 sections: List[Tuple[str, int, str]], profile: ParserProfile):
+        self.filename = filename
+        self.potential_names = potential_names
+        self.profile = profile
+
+        # Score of each detected header for every target section it matches
+        self.header_scores: Dict[str, Dict[str, int]] = {
+            section_header: dict(profile.header_resolver.scores(section_header))
+            for section_header, _, _ in sections
+        }
+
+        # (name, uppercase name, whole-name pattern, words of 3+ characters with their uppercase)
+        self.names: List[Tuple[str, str, re.Pattern, List[Tuple[str, str]]]] = []
+        for name in potential_names:
+            name_words = name.split()
+            fuzzy_words = [(word, word.upper()) for word in name_words if len(word) >= 3] if len(name_words) > 1 else []
+            self.names.append((
+                name,
+                name.upper(),
+                re.compile(rf'\b{re.escape(name)}\b', re.IGNORECASE),
+                fuzzy_words
+            ))
+
+        # Fuzzy verdicts by (uppercase word, uppercase name word); the same
+        # words recur across the sections of a resume
+        self._name_word_matches: Dict[Tuple[str, str], bool] = {}
+
+    def is_name_word(self, word_upper: str, name_word_upper: str) -> bool:
+        """Check if a word of the content is at least 85% similar to a word of the name"""
+        key = (word_upper, name_word_upper)
+        matches = self._name_word_matches.get(key)
+        if matches is None:
+            matches = fuzz.ratio(word_upper, name_word_upper) >= 85
+            self._name_word_matches[key] = matches
+        return matches
+
 
 class RawSectionParser:
     """Raw parser that uses fuzzy matching on uppercase section titles"""
@@ -18,7 +100,13 @@ class RawSectionParser:
     def __init__(self):
         self.logger = logger
 
-        # Load filter strings from file
+        # Compiled profiles by (project_id, config hash), least recently used first
+        self._profiles: "OrderedDict[Tuple[Optional[int], str], ParserProfile]" = OrderedDict()
+        self._profiles_lock = threading.Lock()  # Documents are parsed in threads when DOCUMENT_WORKERS=0
+
+        # Load filter strings from the project root, again whenever the file changes
+        self.filter_file = Path(__file__).parent.parent.parent.parent / "filter_strings.txt"
+        self._filter_file_version = self._filter_file_mtime()
         self.filter_strings = self._load_filter_strings()
 
         # Define the 7 target sections we're looking for
@@ -80,19 +168,91 @@ class RawSectionParser:
             'OWASP', 'Penetration Testing', 'Vulnerability Assessment', 'SIEM', 'IDS', 'IPS', 'Firewall',
             'OAuth', 'SAML', 'JWT', 'SSL/TLS', 'PKI'
         ]
+        self.skill_matcher = skill_matcher(self.exact_skills)
+
+    def get_profile(self, options: Optional[Dict[str, Any]] = None) -> ParserProfile:
+        """
+        Get the compiled parser profile for a project's parsing options.
+
+        options holds project_id, section_headers, use_default_headers and
+        filter_strings from the project's parsing configuration; None uses the
+        defaults. Profiles are cached by (project_id, config hash), so matchers
+        are compiled once per configuration change rather than per document.
+        """
+        options = options or {}
+        section_headers = options.get('section_headers') or None
+        use_default_headers = bool(options.get('use_default_headers', True))
+        filter_strings = options.get('filter_strings') or []
+
+        config = json.dumps([section_headers, use_default_headers, filter_strings])
+        key = (options.get('project_id'), hashlib.sha1(config.encode('utf-8')).hexdigest())
+        with self._profiles_lock:
+            self._refresh_filter_strings()
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+            filter_strings_loaded = self.filter_strings
+
+        if section_headers and not use_default_headers:
+            # Custom headers replace the defaults
+            target_sections = {section: list(headers) for section, headers in section_headers.items()}
+        else:
+            # Custom headers are added to the defaults, and new sections after them
+            target_sections = {section: list(headers) for section, headers in self.target_sections.items()}
+            for section, headers in (section_headers or {}).items():
+                known = target_sections.setdefault(section, [])
+                known.extend(header for header in headers if header not in known)
+
+        project_filter_strings = [filter_string.strip() for filter_string in filter_strings if filter_string.strip()]
+        profile = ParserProfile(target_sections, filter_strings_loaded + project_filter_strings)
+        with self._profiles_lock:
+            self._profiles[key] = profile
+            if len(self._profiles) > PROFILE_CACHE_SIZE:
+                self._profiles.popitem(last=False)
+        self.logger.info(f"Compiled parser profile for project {key[0]}: {len(target_sections)} sections, "
+                         f"{len(profile.filter_index.filter_strings)} filter strings")
+        return profile
+
+    def current_filter_strings(self) -> List[str]:
+        """Get the global filter strings, reloading filter_strings.txt if it has changed"""
+        with self._profiles_lock:
+            self._refresh_filter_strings()
+            return self.filter_strings
+
+    def _filter_file_mtime(self) -> Optional[int]:
+        try:
+            return self.filter_file.stat().st_mtime_ns
+        except OSError:
+            return None
 
-    def parse_resume(self, text: str, filename: str = "", return_raw_sections: bool = False) -> Dict[str, Any]:
-        """Parse resume using raw section-based approach with fuzzy matching"""
+    def _refresh_filter_strings(self):
+        """Reload filter_strings.txt when it has changed, so edits apply without a restart"""
+        version = self._filter_file_mtime()
+        if version != self._filter_file_version:
+            self._filter_file_version = version
+            self.filter_strings = self._load_filter_strings()
+            # Every profile includes the global filter strings
+            self._profiles.clear()
+
+    def parse_resume(self, text: str, filename: str = "", return_raw_sections: bool = False,
+                     profile: Optional[ParserProfile] = None) -> Dict[str, Any]:
+        """Parse resume using raw section-based approach with fuzzy matching, with a project's profile or the defaults"""
         try:
-            self.logger.info(f"Using raw section parser for {filename}")
+            self.logger.debug("Using raw section parser for %s", filename)
+            profile = profile or self.get_profile()
 
             # Find all potential sections with their positions
             sections = self._find_sections(text)
 
+            # Name variants from the filename and header scores, shared by every section
+            context = ParseContext(filename, self._extract_person_name_from_filename(filename),
+                                   sections, profile)
+
             # Extract content for each target section
             extracted_data = {}
-            for target_section in self.target_sections.keys():
-                extracted_data[target_section] = self._extract_section_content(text, sections, target_section, filename)
+            for target_section in profile.target_sections.keys():
+                extracted_data[target_section] = self._extract_section_content(text, sections, target_section, context)
 
             if return_raw_sections:
                 # Return raw section content without processing but with name removal
@@ -101,9 +261,9 @@ class RawSectionParser:
                 for section_key, section_content in extracted_data.items():
                     if section_content:
                         # Apply filter strings removal
-                        cleaned_content = self._remove_filter_strings(section_content)
+                        cleaned_content = self._remove_filter_strings(section_content, profile.filter_index)
                         # Apply name removal
-                        cleaned_content = self._remove_person_name_from_content(cleaned_content, filename)
+                        cleaned_content = self._remove_person_name_from_content(cleaned_content, context)
                         cleaned_sections[section_key] = cleaned_content or ''
                     else:
                         cleaned_sections[section_key] = ''
@@ -114,18 +274,15 @@ class RawSectionParser:
                         'processed_at': datetime.now().isoformat(),
                         'parsing_method': 'raw_section_content'
                     },
-                    'raw_sections': {
-                        'summary': cleaned_sections['summary'],
-                        'specialization': cleaned_sections['specialization'],
-                        'skills': cleaned_sections['skills'],
-                        'current_project': cleaned_sections['current_project'],
-                        'prior_experience': cleaned_sections['prior_experience'],
-                        'education': cleaned_sections['education'],
-                        'certifications': cleaned_sections['certifications']
-                    },
-                    'detected_sections': self._get_section_info(sections)
+                    # The profile's target sections, in order: the 7 defaults unless custom headers add or replace them
+                    'raw_sections': cleaned_sections,
+                    'detected_sections': self._get_section_info(sections, context)
                 }
             else:
+                # Sections missing from a profile with custom headers are left empty
+                for section_key in self.target_sections:
+                    extracted_data.setdefault(section_key, None)
+
                 # Process sections into structured data (original behavior)
                 # Process skills with exact matching
                 if extracted_data['skills']:
@@ -169,7 +326,7 @@ class RawSectionParser:
                     }
                 }
 
-            self.logger.info(f"Raw section parsing completed for {filename}")
+            self.logger.debug("Raw section parsing completed for %s", filename)
             return parsed_data
 
         except Exception as e:
@@ -184,39 +341,63 @@ class RawSectionParser:
                 }
             }
 
+    def parse_batch(self, documents: Iterable[Tuple[str, str]], return_raw_sections: bool = False,
+                    profile_options: Optional[Dict[str, Any]] = None, executor: Optional[Executor] = None,
+                    chunk_size: Optional[int] = None) -> List[DocumentResult]:
+        """
+        Parse a batch of (text, filename) documents, returning results in order.
+
+        With an executor (e.g. a ProcessPoolExecutor or the document pool's
+        supervised pool) documents are sent to the workers in chunks and each
+        worker compiles the profile options once; without one, the profile is
+        compiled once for the batch. A document whose parsing fails carries
+        the error instead of a value.
+        """
+        if executor is None:
+            profile = self.get_profile(profile_options)
+            results = map_documents(
+                lambda document, _: self.parse_resume(document[0], document[1], return_raw_sections, profile),
+                documents
+            )
+        else:
+            results = map_documents(
+                _parse_in_worker, documents, (return_raw_sections, profile_options), executor, chunk_size
+            )
+        return [
+            DocumentResult(error=result.value['error']) if result.ok and 'error' in result.value else result
+            for result in results
+        ]
+
     def _find_sections(self, text: str) -> List[Tuple[str, int, str]]:
         """Find all potential section headers in the text"""
         sections = []
 
-        # Look for uppercase text that could be section headers
-        # Pattern: Line that starts with UPPERCASE words, possibly with spaces/punctuation
-        section_pattern = r'^[A-Z][A-Z\s&/\-:()]{2,50}$'
+        # Single pass over the lines, tracking each line's offset in the text
+        offset = 0
+        for line in text.split('\n'):
+            line_start = offset
+            offset += len(line) + 1
 
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if len(line) >= 3 and re.match(section_pattern, line):
-                # Find the position in the original text
-                pos = text.find(line, sum(len(lines[j]) + 1 for j in range(i)))
-                sections.append((line, pos, 'potential_header'))
-
-        # Also look for common patterns like "Section:" or "SECTION -"
-        colon_pattern = r'^([A-Z][A-Z\s&/\-()]{2,30})[:\-]'
-        for i, line in enumerate(lines):
-            line = line.strip()
-            match = re.match(colon_pattern, line)
-            if match:
-                header = match.group(1).strip()
-                pos = text.find(line, sum(len(lines[j]) + 1 for j in range(i)))
-                sections.append((header, pos, 'header_with_delimiter'))
+            stripped = line.strip()
+            # Both header patterns start with an uppercase letter
+            if not stripped or not 'A' <= stripped[0] <= 'Z':
+                continue
+            pos = line_start + len(line) - len(line.lstrip())
+
+            # Line that is all UPPERCASE words, possibly with spaces/punctuation
+            if len(stripped) >= 3 and _SECTION_HEADER_PATTERN.match(stripped):
+                sections.append((stripped, pos, 'potential_header'))
 
-        # Sort by position in text
-        sections.sort(key=lambda x: x[1])
+            # Also look for common patterns like "Section:" or "SECTION -"
+            match = _DELIMITED_HEADER_PATTERN.match(stripped)
+            if match:
+                sections.append((match.group(1).strip(), pos, 'header_with_delimiter'))
 
-        self.logger.info(f"Found {len(sections)} potential section headers")
+        # Lines are scanned in order, so sections are already sorted by position
+        self.logger.debug("Found %d potential section headers", len(sections))
         return sections
 
-    def _get_section_info(self, sections: List[Tuple[str, int, str]]) -> List[Dict[str, Any]]:
+    def _get_section_info(self, sections: List[Tuple[str, int, str]], context: ParseContext) -> List[Dict[str, Any]]:
         """Get information about all detected sections"""
         section_info = []
         for section_header, position, header_type in sections:
@@ -224,57 +405,26 @@ class RawSectionParser:
                 'header': section_header,
                 'position': position,
                 'type': header_type,
-                'matched_to': self._find_target_match(section_header)
+                'matched_to': context.profile.header_resolver.best_target(section_header)
             })
         return section_info
 
-    def _find_target_match(self, section_header: str) -> Optional[str]:
-        """Find which target section this header matches to"""
-        best_match = None
-        best_score = 0
-
-        for target_section, target_headers in self.target_sections.items():
-            for target_header in target_headers:
-                score = fuzz.ratio(section_header.upper(), target_header.upper())
-                threshold = 90 if target_section == 'skills' else 70
-
-                if score >= threshold and score > best_score:
-                    best_match = target_section
-                    best_score = score
-
-        return best_match
-
-    def _extract_section_content(self, text: str, sections: List[Tuple[str, int, str]], target_section: str, filename: str = "") -> Optional[str]:
+    def _extract_section_content(self, text: str, sections: List[Tuple[str, int, str]], target_section: str, context: ParseContext) -> Optional[str]:
         """Extract content for a specific target section using fuzzy matching"""
-        target_headers = self.target_sections[target_section]
-
         best_match = None
         best_score = 0
         best_position = -1
 
-        # Find the best matching section header using fuzzy matching
+        # Find the best matching section header, from the fuzzy scores resolved once per header
         for section_header, position, header_type in sections:
-            for target_header in target_headers:
-                # Use fuzzy matching to find similar headers
-                score = fuzz.ratio(section_header.upper(), target_header.upper())
-
-                # For skills, require exact match or very high similarity
-                if target_section == 'skills':
-                    if score >= 90:  # Very high threshold for skills
-                        if score > best_score:
-                            best_match = section_header
-                            best_score = score
-                            best_position = position
-                else:
-                    # For other sections, use lower threshold
-                    if score >= 70:  # Lower threshold for other sections
-                        if score > best_score:
-                            best_match = section_header
-                            best_score = score
-                            best_position = position
+            score = context.header_scores[section_header].get(target_section, 0)
+            if score > best_score:
+                best_match = section_header
+                best_score = score
+                best_position = position
 
         if best_match:
-            self.logger.info(f"Matched '{target_section}' to '{best_match}' (score: {best_score})")
+            self.logger.debug("Matched '%s' to '%s' (score: %d)", target_section, best_match, best_score)
 
             # Find the next section to determine content boundaries
             next_position = len(text)
@@ -291,14 +441,14 @@ class RawSectionParser:
             section_content = self._clean_section_content(section_content)
 
             # Apply filter strings removal
-            section_content = self._remove_filter_strings(section_content)
+            section_content = self._remove_filter_strings(section_content, context.profile.filter_index)
 
             # Remove person's name from content if filename contains name
-            section_content = self._remove_person_name_from_content(section_content, filename)
+            section_content = self._remove_person_name_from_content(section_content, context)
 
             return section_content if section_content else None
 
-        self.logger.warning(f"No match found for section: {target_section}")
+        self.logger.debug("No match found for section: %s", target_section)
         return None
 
     def _clean_section_content(self, content: str) -> str:
@@ -326,9 +476,8 @@ class RawSectionParser:
         """Load filter strings from file"""
         filter_strings = []
 
-        # Look for filter_strings.txt in the project root
-        project_root = Path(__file__).parent.parent.parent.parent
-        filter_file = project_root / "filter_strings.txt"
+        # filter_strings.txt in the project root
+        filter_file = self.filter_file
 
         try:
             if filter_file.exists():
@@ -348,9 +497,9 @@ class RawSectionParser:
 
         return filter_strings
 
-    def _remove_filter_strings(self, content: str) -> str:
+    def _remove_filter_strings(self, content: str, filter_index: FilterIndex) -> str:
         """Remove filter strings from content using fuzzy matching"""
-        if not content or not self.filter_strings:
+        if not content or not filter_index.filter_strings:
             return content
 
         lines = content.split('\n')
@@ -363,27 +512,17 @@ class RawSectionParser:
                 filtered_lines.append(line)
                 continue
 
-            should_remove = False
-
-            # Check each filter string with fuzzy matching
-            for filter_string in self.filter_strings:
-                # Use fuzzy matching with 85% threshold for removal
-                similarity = fuzz.ratio(line_stripped.upper(), filter_string.upper())
-
-                # Also check if filter string is contained in the line
-                if (similarity >= 85 or
-                    filter_string.upper() in line_stripped.upper() or
-                    line_stripped.upper() in filter_string.upper()):
-                    should_remove = True
-                    removed_count += 1
-                    self.logger.debug(f"Removing line '{line_stripped}' (matched '{filter_string}', similarity: {similarity}%)")
-                    break
-
-            if not should_remove:
+            # Filter strings contained in the line (or containing it), or at least 85% similar
+            match = filter_index.match(line_stripped)
+            if match:
+                filter_string, similarity = match
+                removed_count += 1
+                self.logger.debug("Removing line '%s' (matched '%s', similarity: %d%%)", line_stripped, filter_string, similarity)
+            else:
                 filtered_lines.append(line)
 
         if removed_count > 0:
-            self.logger.info(f"Removed {removed_count} lines matching filter strings")
+            self.logger.debug("Removed %d lines matching filter strings", removed_count)
 
         return '\n'.join(filtered_lines)
 
@@ -445,17 +584,13 @@ class RawSectionParser:
         final_names = [name for name in potential_names if 2 <= len(name) <= 50]
 
         if final_names:
-            self.logger.info(f"Extracted potential names from filename '{filename}': {final_names}")
+            self.logger.debug("Extracted potential names from filename '%s': %s", filename, final_names)
 
         return final_names
 
-    def _remove_person_name_from_content(self, content: str, filename: str) -> str:
+    def _remove_person_name_from_content(self, content: str, context: ParseContext) -> str:
         """Remove person's name from content using fuzzy matching"""
-        if not content or not filename:
-            return content
-
-        potential_names = self._extract_person_name_from_filename(filename)
-        if not potential_names:
+        if not content or not context.names:
             return content
 
         lines = content.split('\n')
@@ -470,15 +605,16 @@ class RawSectionParser:
 
             should_remove_line = False
             original_line = line_stripped
+            line_upper = line_stripped.upper()
 
             # Check if entire line should be removed (if it's mostly just the person's name)
-            for name in potential_names:
+            for name, name_upper, _, _ in context.names:
                 # Check if the line is primarily the person's name
-                similarity = fuzz.ratio(line_stripped.upper(), name.upper())
+                similarity = fuzz.ratio(line_upper, name_upper)
                 if similarity >= 80:  # High threshold for removing entire line
                     should_remove_line = True
                     removed_count += 1
-                    self.logger.debug(f"Removing entire line '{line_stripped}' (name match: '{name}', similarity: {similarity}%)")
+                    self.logger.debug("Removing entire line '%s' (name match: '%s', similarity: %d%%)", line_stripped, name, similarity)
                     break
 
             if should_remove_line:
@@ -486,45 +622,39 @@ class RawSectionParser:
 
             # If not removing the entire line, try to remove name mentions within the line
             modified_line = line_stripped
-            for name in potential_names:
+            for _, _, name_pattern, name_words in context.names:
                 # Remove exact matches (case insensitive)
-                name_pattern = re.escape(name)
-                modified_line = re.sub(rf'\b{name_pattern}\b', '[NAME_REMOVED]', modified_line, flags=re.IGNORECASE)
-
-                # Also check individual name components
-                name_words = name.split()
-                if len(name_words) > 1:
-                    for word in name_words:
-                        if len(word) >= 3:  # Only remove words of 3+ characters to avoid false positives
-                            word_pattern = re.escape(word)
-                            # Use fuzzy matching for individual words
-                            words_in_line = modified_line.split()
-                            new_words = []
-                            for line_word in words_in_line:
-                                clean_word = re.sub(r'[^\w]', '', line_word)  # Remove punctuation for matching
-                                if (len(clean_word) >= 3 and
-                                    fuzz.ratio(clean_word.upper(), word.upper()) >= 85):
-                                    new_words.append('[NAME_REMOVED]')
-                                    self.logger.debug(f"Replaced word '{line_word}' with [NAME_REMOVED] (fuzzy match: '{word}')")
-                                else:
-                                    new_words.append(line_word)
-                            modified_line = ' '.join(new_words)
+                modified_line = name_pattern.sub('[NAME_REMOVED]', modified_line)
+
+                # Also check individual name components of 3+ characters, to avoid false positives
+                for word, word_upper in name_words:
+                    # Use fuzzy matching for individual words
+                    words_in_line = modified_line.split()
+                    new_words = []
+                    for line_word in words_in_line:
+                        clean_word = _NON_WORD_CHARS.sub('', line_word)  # Remove punctuation for matching
+                        if len(clean_word) >= 3 and context.is_name_word(clean_word.upper(), word_upper):
+                            new_words.append('[NAME_REMOVED]')
+                            self.logger.debug("Replaced word '%s' with [NAME_REMOVED] (fuzzy match: '%s')", line_word, word)
+                        else:
+                            new_words.append(line_word)
+                    modified_line = ' '.join(new_words)
 
             # Clean up multiple consecutive [NAME_REMOVED] tokens
-            modified_line = re.sub(r'\[NAME_REMOVED\](\s*\[NAME_REMOVED\])+', '[NAME_REMOVED]', modified_line)
+            modified_line = _REPEATED_NAME_MARKERS.sub('[NAME_REMOVED]', modified_line)
 
             # Clean up extra spaces
-            modified_line = re.sub(r'\s+', ' ', modified_line).strip()
+            modified_line = _WHITESPACE_RUNS.sub(' ', modified_line).strip()
 
             # Only keep the line if it has substantial content after name removal
             if modified_line and modified_line != '[NAME_REMOVED]' and len(modified_line.replace('[NAME_REMOVED]', '').strip()) > 5:
                 filtered_lines.append(modified_line)
             elif original_line != modified_line:
                 removed_count += 1
-                self.logger.debug(f"Removed line after name removal: '{original_line}' -> '{modified_line}'")
+                self.logger.debug("Removed line after name removal: '%s' -> '%s'", original_line, modified_line)
 
         if removed_count > 0:
-            self.logger.info(f"Removed or modified {removed_count} lines containing person's name")
+            self.logger.debug("Removed or modified %d lines containing person's name", removed_count)
 
         return '\n'.join(filtered_lines)
 
@@ -533,17 +663,8 @@ class RawSectionParser:
         if not skills_text:
             return []
 
-        found_skills = []
-        skills_upper = skills_text.upper()
-
-        for skill in self.exact_skills:
-            # Check for exact match (case insensitive)
-            skill_upper = skill.upper()
-
-            # Look for the skill as a whole word
-            pattern = r'\b' + re.escape(skill_upper) + r'\b'
-            if re.search(pattern, skills_upper):
-                found_skills.append(skill)
+        # Skills as whole words, in a single pass over the text
+        found_skills = self.skill_matcher.found(skills_text)
 
         # Also look for common skill patterns like bullet points
         lines = skills_text.split('\n')
@@ -554,12 +675,11 @@ class RawSectionParser:
             clean_line = clean_line.strip(' •-*+')
 
             if clean_line:
-                for skill in self.exact_skills:
-                    if clean_line.upper() == skill.upper():
-                        if skill not in found_skills:
-                            found_skills.append(skill)
+                skill = self.skill_matcher.exact(clean_line)
+                if skill and skill not in found_skills:
+                    found_skills.append(skill)
 
-        self.logger.info(f"Found {len(found_skills)} exact skill matches")
+        self.logger.debug("Found %d exact skill matches", len(found_skills))
         return found_skills
 
     def _parse_experience_entries(self, experience_text: str) -> List[Dict[str, str]]:
@@ -726,5 +846,12 @@ class RawSectionParser:
         return certifications
 
 
+def _parse_in_worker(document: Tuple[str, str], options: Tuple) -> Dict[str, Any]:
+    """Parse one document of a batch with the worker's parser (runs in a worker process)"""
+    text, filename = document
+    return_raw_sections, profile_options = options
+    return section_parser.parse_resume(text, filename, return_raw_sections, section_parser.get_profile(profile_options))
+
+
 # Create a singleton instance
 section_parser = RawSectionParser()
\ No newline at end of file
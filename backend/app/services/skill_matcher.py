@@ -0,0 +1,99 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.services.keyword_matcher import _trie_pattern
+
+# A skill must not be glued to a word on either side. Unlike \b, this also
+# holds for skills that end in punctuation, such as 'C++' followed by a space.
+_LEFT_BOUNDARY = r'(?<!\w)'
+_RIGHT_BOUNDARY = r'(?!\w)'
+
+
+class SkillHit(NamedTuple):
+    skill: str
+    start: int
+    end: int
+
+
+class SkillMatcher:
+    """
+    Finds a fixed list of skills in a text in a single pass.
+
+    All skills are compiled into one case-insensitive, prefix-sharing regex
+    with word boundaries, tried at every position of the text, so the text
+    is scanned once whatever the number of skills. Hits are reported with
+    their offsets in the original text.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        self.skills: Tuple[str, ...] = tuple(dict.fromkeys(skill for skill in skills if skill))
+        self._order = {skill: index for index, skill in enumerate(self.skills)}
+
+        # Skills by uppercase text, the first listed winning when two differ only in case
+        self._by_upper: Dict[str, str] = {}
+        for skill in self.skills:
+            self._by_upper.setdefault(skill.upper(), skill)
+
+        self._pattern = None
+        if self._by_upper:
+            trie = _trie_pattern(sorted(self._by_upper))
+            self._pattern = re.compile(f"(?=({_LEFT_BOUNDARY}{trie}{_RIGHT_BOUNDARY}))", re.IGNORECASE)
+
+        # The scan reports the longest skill starting at each position; every
+        # skill found inside it with its own boundaries occurs in the text too
+        bounded = {
+            skill: re.compile(f"{_LEFT_BOUNDARY}{re.escape(skill)}{_RIGHT_BOUNDARY}", re.IGNORECASE)
+            for skill in self._by_upper.values()
+        }
+        self._contained: Dict[str, FrozenSet[str]] = {
+            skill: frozenset(
+                other for other, other_upper in zip(self._by_upper.values(), self._by_upper)
+                if other_upper in skill.upper() and bounded[other].search(skill)
+            )
+            for skill in self._by_upper.values()
+        }
+
+    def _canonical(self, matched: str) -> Optional[str]:
+        skill = self._by_upper.get(matched.upper())
+        if skill is None:
+            # Case-insensitive matching also accepts characters such as the
+            # dotless i, whose uppercase is not plain ASCII
+            skill = next((skill for skill in self._by_upper.values()
+                          if re.fullmatch(re.escape(skill), matched, re.IGNORECASE)), None)
+        return skill
+
+    def _scan(self, text: str) -> List[SkillHit]:
+        hits = []
+        for match in self._pattern.finditer(text):
+            skill = self._canonical(match.group(1))
+            if skill is not None:
+                hits.append(SkillHit(skill, match.start(1), match.end(1)))
+        return hits
+
+    def finditer(self, text: str) -> List[SkillHit]:
+        """Get the longest skill starting at each position where one occurs, in text order"""
+        if self._pattern is None or not text:
+            return []
+        return self._scan(text)
+
+    def found(self, text: str) -> List[str]:
+        """Get the skills that occur in the text, in the order they are listed"""
+        found = set()
+        for hit in self.finditer(text):
+            found |= self._contained[hit.skill]
+        return sorted(found, key=self._order.__getitem__)
+
+    def exact(self, text: str) -> Optional[str]:
+        """Get the skill the whole text is equal to, ignoring case"""
+        return self._by_upper.get(text.upper())
+
+
+@lru_cache(maxsize=16)
+def _cached_matcher(skills: Tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+
+def skill_matcher(skills: Iterable[str]) -> SkillMatcher:
+    """Get the compiled matcher for a skill list, building it on first use"""
+    return _cached_matcher(tuple(skills))
@@ -0,0 +1,276 @@
+import os
+import glob
+import time
+import queue
+import signal
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How often a busy worker is checked against its memory budget
+POLL_INTERVAL_SECONDS = 0.25
+
+# Time allowed for a new worker to run its initializer (e.g. load OCR models)
+STARTUP_TIMEOUT_SECONDS = 300
+
+
+class WorkerBudgetError(RuntimeError):
+    """Raised for a task whose worker ran out of time or memory, or died, and was recycled"""
+
+
+def _worker_main(conn, initializer: Optional[Callable], initargs: Tuple):
+    """Worker process loop: run tasks received over the pipe until told to stop"""
+    if hasattr(os, "setpgid"):
+        # Lead a process group of our own, so that killing the worker also
+        # kills anything a task started, such as pdftoppm under pdf2image
+        os.setpgid(0, 0)
+
+    if initializer is not None:
+        initializer(*initargs)
+
+    # Tell the parent we are ready so startup time is not charged to a task
+    conn.send(True)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        fn, args = task
+        try:
+            conn.send((True, fn(*args)))
+        except MemoryError:
+            conn.send((False, WorkerBudgetError("Worker ran out of memory")))
+            break
+        except Exception as e:
+            try:
+                conn.send((False, e))
+            except Exception:
+                # The exception itself could not be pickled
+                conn.send((False, RuntimeError(repr(e))))
+
+
+def _child_pids(pid: int) -> List[int]:
+    """Direct children of a process, read from /proc"""
+    children = []
+    for path in glob.glob(f"/proc/{pid}/task/*/children"):
+        try:
+            with open(path) as f:
+                children.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return children
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """
+    Resident memory of a process and all of its descendants in MB, None
+    where /proc is not available.
+    """
+    resident_pages = 0
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                resident_pages += int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            if current == pid:
+                return None
+            # A child that exited while being read
+            continue
+        pids.extend(_child_pids(current))
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _kill_process_group(process):
+    """Kill a worker together with every process in its process group"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        # No process groups on this platform, or the worker never made its own
+        process.kill()
+
+
+class _Worker:
+    """One spawned process and the parent end of its pipe"""
+
+    def __init__(self, context, name: str, initializer: Optional[Callable], initargs: Tuple):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, initializer, initargs),
+            name=name,
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        try:
+            ready = self.conn.poll(STARTUP_TIMEOUT_SECONDS) and self.conn.recv()
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            self.process.join(5)
+            self.kill()
+            raise WorkerBudgetError(f"Worker process failed to start (exit code {self.process.exitcode})")
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        _kill_process_group(self.process)
+        self.process.join()
+        self.conn.close()
+
+    def stop(self, timeout: float = 5.0):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            _kill_process_group(self.process)
+            self.process.join()
+        self.conn.close()
+
+
+class SupervisedProcessPool(Executor):
+    """
+    Process pool that enforces a wall-clock and memory budget on every task.
+
+    Each worker is a spawned process supervised by its own thread. A task
+    that runs past timeout_seconds, or whose worker grows beyond
+    memory_limit_mb of resident memory (counting any processes the worker
+    started), has its worker and those processes killed and the worker replaced;
+    the task's future fails with WorkerBudgetError giving the reason. Other
+    tasks are unaffected. A limit of 0 or None disables that check.
+
+    Implements the Executor interface, so it can be passed to
+    loop.run_in_executor like a ProcessPoolExecutor.
+    """
+
+    def __init__(self, max_workers: int, initializer: Optional[Callable] = None, initargs: Tuple = (),
+                 timeout_seconds: Optional[float] = None, memory_limit_mb: Optional[int] = None,
+                 name: str = "worker"):
+        self.max_workers = max(1, max_workers)
+        self.timeout_seconds = timeout_seconds or None
+        self.memory_limit_mb = memory_limit_mb or None
+        self.name = name
+
+        self._initializer = initializer
+        self._initargs = initargs
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._shutdown = False
+
+        self._threads = [
+            threading.Thread(target=self._supervise, args=(index,), name=f"{name}-supervisor-{index}", daemon=True)
+            for index in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if kwargs:
+            raise TypeError("SupervisedProcessPool tasks take positional arguments only")
+        if self._shutdown:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+        future = Future()
+        self._tasks.put((future, fn, args))
+        return future
+
+    def _spawn(self, index: int) -> _Worker:
+        return _Worker(self._context, f"{self.name}-{index}", self._initializer, self._initargs)
+
+    def _wait_for_result(self, worker: _Worker) -> Tuple[bool, Any]:
+        """Wait for the worker's reply while enforcing the budgets"""
+        deadline = time.monotonic() + self.timeout_seconds if self.timeout_seconds else None
+
+        while True:
+            wait = POLL_INTERVAL_SECONDS
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - time.monotonic()))
+
+            try:
+                if worker.conn.poll(wait):
+                    return worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join()
+                raise WorkerBudgetError(f"Worker process died (exit code {worker.process.exitcode})")
+
+            if deadline is not None and time.monotonic() >= deadline:
+                worker.kill()
+                raise WorkerBudgetError(f"Timed out after {self.timeout_seconds:g}s")
+
+            if self.memory_limit_mb:
+                rss = _rss_mb(worker.process.pid)
+                if rss is not None and rss > self.memory_limit_mb:
+                    worker.kill()
+                    raise WorkerBudgetError(f"Exceeded the {self.memory_limit_mb} MB memory budget ({rss:.0f} MB)")
+
+    def _supervise(self, index: int):
+        """Feed tasks to one worker process, replacing it whenever it is lost"""
+        worker = None
+
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                break
+
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if worker is None or not worker.is_alive():
+                    worker = self._spawn(index)
+                worker.conn.send((fn, args))
+                ok, value = self._wait_for_result(worker)
+            except WorkerBudgetError as e:
+                logger.warning(f"{self.name} worker {index} recycled: {e}")
+                worker = None
+                future.set_exception(e)
+                continue
+            except Exception as e:
+                future.set_exception(e)
+                continue
+
+            if ok:
+                future.set_result(value)
+            else:
+                if isinstance(value, WorkerBudgetError):
+                    # The worker exits after running out of memory
+                    worker.process.join()
+                    worker = None
+                future.set_exception(value)
+
+        if worker is not None:
+            worker.stop()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._shutdown = True
+
+        if cancel_futures:
+            while True:
+                try:
+                    item = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+
+        for _ in self._threads:
+            self._tasks.put(None)
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
@@ -1,10 +1,61 @@
 import re
 import logging
-from typing import Optional, Dict, List
+from functools import lru_cache
+from concurrent.futures import Executor
+from typing import Iterable, Optional, Dict, List, Tuple
 from datetime import datetime
 
+from app.services.batch_runner import DocumentResult, map_documents
+from app.services.keyword_matcher import KeywordMatcher, keyword_matcher
+from app.services.token_counters import TOKEN_COUNTERS, TokenCounter
+
 logger = logging.getLogger(__name__)
 
+# Bump when cleaning output changes so stored cleaned texts are cleaned again
+CLEANER_VERSION = "cleaner-1"
+
+# Characters that case-insensitive regexes match to ASCII letters although
+# str.lower() does not map them there (İ, ı, ſ and the Kelvin sign). Texts
+# containing them skip the literal prefilters and run every pattern.
+_IRREGULAR_CASE_CHARS = re.compile('[\u0130\u0131\u017f\u212a]')
+
+# Basic normalization: dashes and ellipses replaced, zero-width characters removed
+_NORMALIZE_CHARS = {'–': '-', '—': '-', '…': '...', '\u200b': '', '\u200c': '', '\u200d': '', '\ufeff': ''}
+_NORMALIZE = re.compile('[' + ''.join(_NORMALIZE_CHARS) + ']')
+
+# Literals that noise patterns without a leading word cannot match without
+_NOISE_LITERALS = {
+    r'[•·]{2,}': ('•', '·'),
+    r'\*{2,}': ('**',),
+}
+
+# Pipe, comma and colon separators, normalized in this order
+_SEPARATORS = [
+    ('|', re.compile(r'\|\s*'), ' | '),
+    (',', re.compile(r',\s*'), ', '),
+    (':', re.compile(r':\s*'), ': '),
+]
+
+_DIGITS = re.compile(r'\d+')
+_STOP_WORDS = re.compile(r'\b(the|and|or|of|in|at|to|for|with)\b')
+_LIGHT_NOISE = re.compile(r'\b(page\s+\d+|confidential)\b', re.IGNORECASE)
+_CONTACT_LINES = re.compile(r'^\s*(?:address|phone|email|linkedin).*$', re.IGNORECASE | re.MULTILINE)
+_SENTENCE_END = re.compile(r'[.!?]+')
+
+
+@lru_cache(maxsize=4)
+def _old_date_pattern(current_year: int) -> re.Pattern:
+    """Years more than about five years back, compiled once per calendar year"""
+    return re.compile(rf'\b(?:19\d{{2}}|20(?:0\d|1[0-{str(current_year-5)[-1]}]))\b')
+
+
+def _required_literals(pattern: str) -> Tuple[str, ...]:
+    """Get lowercase strings of which a noise pattern needs at least one to match, empty if unknown"""
+    if pattern in _NOISE_LITERALS:
+        return _NOISE_LITERALS[pattern]
+    match = re.match(r'(?:\\b)?([a-z]{4,})', pattern)
+    return (match.group(1),) if match else ()
+
 
 class TextCleaner:
     """Service for cleaning and optimizing resume text for embedding generation"""
@@ -62,14 +113,30 @@ class TextCleaner:
             'degree', 'bachelor', 'master', 'phd', 'certification',
             'certified', 'license', 'accredited'
         ]
+
+        # Compile the pipeline once; each noise pattern keeps the literals it requires
+        # so it can be skipped for texts that contain none of them
+        self._noise_pipeline = [
+            (re.compile(pattern, re.IGNORECASE | re.MULTILINE), _required_literals(pattern))
+            for pattern in self.noise_patterns
+        ]
+        self._section_heading_patterns = [
+            (section, re.compile(rf'\b{re.escape(section)}\b', re.IGNORECASE))
+            for section in self.low_value_sections
+        ]
+        self._section_block_patterns = [
+            re.compile(rf'\b{re.escape(section)}\b.*?(?=\n\n|\n[A-Z]|$)', re.IGNORECASE | re.DOTALL)
+            for section in self.low_value_sections
+        ]
     
-    def clean_text(self, text: str, intensity: str = "medium") -> str:
+    def clean_text(self, text: str, intensity: str = "medium", keywords: Optional[List[str]] = None) -> str:
         """
         Clean and optimize text for embedding generation
         
         Args:
             text: Raw extracted text
             intensity: Cleaning intensity ('light', 'medium', 'aggressive')
+            keywords: High-value keywords to use instead of the defaults
         
         Returns:
             Cleaned and optimized text
@@ -90,7 +157,7 @@ class TextCleaner:
         
         # Step 4: Apply intensity-specific cleaning
         if intensity == "aggressive":
-            cleaned = self._aggressive_cleaning(cleaned)
+            cleaned = self._aggressive_cleaning(cleaned, keywords)
         elif intensity == "medium":
             cleaned = self._medium_cleaning(cleaned)
         else:  # light
@@ -102,85 +169,115 @@ class TextCleaner:
         # Log compression ratio
         final_length = len(cleaned)
         compression_ratio = (original_length - final_length) / original_length * 100
-        logger.info(f"Text cleaned: {original_length} -> {final_length} chars ({compression_ratio:.1f}% reduction)")
+        logger.debug("Text cleaned: %d -> %d chars (%.1f%% reduction)", original_length, final_length, compression_ratio)
         
         return cleaned
+
+    def keyword_matcher(self, keywords: Optional[List[str]] = None) -> KeywordMatcher:
+        """Get the compiled matcher for the given high-value keywords, or the defaults"""
+        return keyword_matcher(keywords if keywords else self.high_value_keywords)
+
+    @staticmethod
+    def _fold(text: str) -> Optional[str]:
+        """Lowercase text for literal prefilters, None when lowercasing cannot be trusted"""
+        if _IRREGULAR_CASE_CHARS.search(text):
+            return None
+        return text.lower()
     
     def _normalize_text(self, text: str) -> str:
         """Basic text normalization"""
         # Fix encoding issues
         text = text.encode('utf-8', errors='ignore').decode('utf-8')
         
-        # Normalize unicode characters
-        text = re.sub(r'[""'']', '"', text)  # Smart quotes to regular quotes
-        text = re.sub(r'[–—]', '-', text)     # Em/en dashes to hyphens
-        text = re.sub(r'[…]', '...', text)    # Ellipsis
-        
-        # Remove zero-width characters
-        text = re.sub(r'[\u200b\u200c\u200d\ufeff]', '', text)
-        
-        return text
+        # Normalize dashes and ellipses, remove zero-width characters
+        return _NORMALIZE.sub(lambda match: _NORMALIZE_CHARS[match.group(0)], text)
     
     def _remove_noise_patterns(self, text: str) -> str:
         """Remove common noise patterns"""
-        for pattern in self.noise_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+        folded = self._fold(text)
+        for pattern, literals in self._noise_pipeline:
+            if literals and folded is not None and not any(literal in folded for literal in literals):
+                continue
+            text, count = pattern.subn('', text)
+            if count and folded is not None:
+                # A removal can join text into a new occurrence of a later word
+                folded = self._fold(text)
         
         return text
     
     def _clean_formatting(self, text: str) -> str:
         """Clean up formatting and whitespace"""
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)  # Multiple newlines to double
-        text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)  # Trim lines
+        # Collapse all whitespace to single spaces and trim. This leaves no
+        # newlines, so the text is a single line from here on.
+        text = ' '.join(text.split())
         
-        # Clean up common formatting artifacts
-        text = re.sub(r'\s*[|]\s*', ' | ', text)  # Normalize pipe separators
-        text = re.sub(r'\s*[,]\s*', ', ', text)   # Normalize commas
-        text = re.sub(r'\s*[:]\s*', ': ', text)   # Normalize colons
+        # Normalize separators. Whitespace next to a separator is now at most
+        # one space, so dropping the space before it and consuming what
+        # follows removes all surrounding whitespace.
+        for separator, pattern, replacement in _SEPARATORS:
+            text = pattern.sub(replacement, text.replace(' ' + separator, separator))
         
         return text
     
     def _light_cleaning(self, text: str) -> str:
         """Light cleaning - minimal changes"""
         # Only remove obvious noise
-        text = re.sub(r'\b(page\s+\d+|confidential)\b', '', text, flags=re.IGNORECASE)
+        text = _LIGHT_NOISE.sub('', text)
         return text
     
     def _medium_cleaning(self, text: str) -> str:
         """Medium cleaning - balanced approach"""
         # Remove low-value sections
-        for section in self.low_value_sections:
-            pattern = rf'\b{re.escape(section)}\b.*?(?=\n\n|\n[A-Z]|$)'
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+        text = self._remove_low_value_sections(text)
         
         # Compress repetitive job descriptions
         text = self._compress_repetitive_content(text)
         
         return text
+
+    def _remove_low_value_sections(self, text: str) -> str:
+        """Remove each low-value section from its heading to the end of its block"""
+        folded = self._fold(text)
+        if '\n' in text or folded is None:
+            for pattern in self._section_block_patterns:
+                text = pattern.sub('', text)
+            return text
+
+        # On a single line a block runs to the end of the text, so each section
+        # in turn cuts the text at its first heading
+        cut = len(text)
+        for section, pattern in self._section_heading_patterns:
+            position = folded.find(section, 0, cut)
+            if position < 0:
+                continue
+            match = pattern.search(text, position, cut)
+            if match:
+                cut = match.start()
+        return text[:cut]
     
-    def _aggressive_cleaning(self, text: str) -> str:
+    def _aggressive_cleaning(self, text: str, keywords: Optional[List[str]] = None) -> str:
         """Aggressive cleaning - maximum compression"""
         # Apply medium cleaning first
         text = self._medium_cleaning(text)
         
         # Additional aggressive measures
         # Remove contact details completely
-        text = re.sub(r'^\s*(?:address|phone|email|linkedin).*$', '', text, flags=re.IGNORECASE | re.MULTILINE)
+        text = _CONTACT_LINES.sub('', text)
         
         # Remove dates from older experience (keep recent)
-        current_year = datetime.now().year
-        old_date_pattern = rf'\b(?:19\d{{2}}|20(?:0\d|1[0-{str(current_year-5)[-1]}]))\b'
-        text = re.sub(old_date_pattern, '', text)
+        text = _old_date_pattern(datetime.now().year).sub('', text)
         
         # Compress long descriptions
-        text = self._compress_long_descriptions(text)
+        text = self._compress_long_descriptions(text, keywords)
         
         return text
     
     def _compress_repetitive_content(self, text: str) -> str:
         """Compress repetitive job descriptions and skills"""
+        # A single line is always kept
+        if '\n' not in text:
+            return text
+
         # Find and compress similar job descriptions
         lines = text.split('\n')
         unique_lines = []
@@ -188,8 +285,8 @@ class TextCleaner:
         
         for line in lines:
             # Create a normalized version for comparison
-            normalized = re.sub(r'\d+', 'NUM', line.lower().strip())
-            normalized = re.sub(r'\b(the|and|or|of|in|at|to|for|with)\b', '', normalized)
+            normalized = _DIGITS.sub('NUM', line.lower().strip())
+            normalized = _STOP_WORDS.sub('', normalized)
             
             if len(normalized) < 10 or normalized not in seen_content:
                 unique_lines.append(line)
@@ -197,15 +294,16 @@ class TextCleaner:
         
         return '\n'.join(unique_lines)
     
-    def _compress_long_descriptions(self, text: str) -> str:
+    def _compress_long_descriptions(self, text: str, keywords: Optional[List[str]] = None) -> str:
         """Compress overly long descriptions"""
+        matcher = self.keyword_matcher(keywords)
         paragraphs = text.split('\n\n')
         compressed = []
         
         for paragraph in paragraphs:
             # If paragraph is very long, try to extract key sentences
             if len(paragraph) > 500:
-                sentences = re.split(r'[.!?]+', paragraph)
+                sentences = _SENTENCE_END.split(paragraph)
                 key_sentences = []
                 
                 for sentence in sentences:
@@ -214,7 +312,7 @@ class TextCleaner:
                         continue
                     
                     # Keep sentences with high-value keywords
-                    if any(keyword in sentence.lower() for keyword in self.high_value_keywords):
+                    if matcher.contains_any(sentence):
                         key_sentences.append(sentence)
                     elif len(key_sentences) < 3:  # Keep first few sentences
                         key_sentences.append(sentence)
@@ -227,71 +325,66 @@ class TextCleaner:
     
     def _final_optimization(self, text: str) -> str:
         """Final optimization pass"""
-        # Remove empty lines
-        text = re.sub(r'\n\s*\n', '\n', text)
-        
-        # Ensure single space between words
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Final trim
-        text = text.strip()
-        
-        return text
+        # Single spaces between words, no empty lines, trimmed
+        return ' '.join(text.split())
     
-    def estimate_tokens(self, text: str) -> int:
+    def estimate_tokens(self, text: str, token_counter: Optional[TokenCounter] = None) -> int:
         """
         Estimate token count for text
-        Rough estimation: 1 token ≈ 4 characters for English text
+        Defaults to the rough estimation of 1 token ≈ 4 characters for English text
         """
-        return len(text) // 4
+        return (token_counter or TOKEN_COUNTERS["chars"]).count(text)
     
-    def truncate_to_token_limit(self, text: str, max_tokens: int = 2000) -> str:
+    def truncate_to_token_limit(self, text: str, max_tokens: int = 2000,
+                                keywords: Optional[List[str]] = None,
+                                token_counter: Optional[TokenCounter] = None) -> str:
         """
         Intelligently truncate text to fit within token limit
         Preserves important sections and maintains readability
-        """
-        estimated_tokens = self.estimate_tokens(text)
         
-        if estimated_tokens <= max_tokens:
+        Paragraphs are packed by keyword score: each one that still fits is
+        kept whole, then the best one left out fills what remains. Token
+        counts come from token_counter (4 chars per token by default) and
+        are memoized per paragraph.
+        """
+        counter = token_counter or TOKEN_COUNTERS["chars"]
+        if counter.count(text) <= max_tokens:
             return text
         
-        # Calculate target character count
-        target_chars = max_tokens * 4
-        
         # Try to preserve important sections
         paragraphs = text.split('\n\n')
-        result = []
-        current_length = 0
         
         # Prioritize paragraphs with high-value keywords
-        scored_paragraphs = []
-        for paragraph in paragraphs:
-            score = sum(1 for keyword in self.high_value_keywords 
-                       if keyword.lower() in paragraph.lower())
-            scored_paragraphs.append((score, paragraph))
+        matcher = self.keyword_matcher(keywords)
+        scored_paragraphs = [(matcher.count(paragraph), paragraph) for paragraph in paragraphs]
         
         # Sort by score (descending) to prioritize important content
         scored_paragraphs.sort(key=lambda x: x[0], reverse=True)
         
+        result = []
+        remaining = max_tokens
+        left_out = None
         for score, paragraph in scored_paragraphs:
-            if current_length + len(paragraph) <= target_chars:
+            tokens = counter.count(paragraph)
+            if tokens <= remaining:
                 result.append(paragraph)
-                current_length += len(paragraph) + 2  # +2 for \n\n
-            else:
-                # Add partial paragraph if space remains
-                remaining_space = target_chars - current_length
-                if remaining_space > 100:  # Only if meaningful space left
-                    truncated = paragraph[:remaining_space-3] + "..."
-                    result.append(truncated)
-                break
+                remaining -= tokens
+            elif left_out is None:
+                left_out = paragraph
+        
+        # Add partial paragraph if meaningful space remains
+        ellipsis_tokens = counter.count("...") or 1
+        if left_out is not None and remaining - ellipsis_tokens > 25:
+            result.append(counter.prefix(left_out, remaining - ellipsis_tokens).rstrip() + "...")
         
         final_text = '\n\n'.join(result)
-        logger.info(f"Text truncated: {len(text)} -> {len(final_text)} chars")
+        logger.debug("Text truncated: %d -> %d chars (%s budget %d tokens)", len(text), len(final_text), counter.name, max_tokens)
         
         return final_text
     
     def clean_and_optimize(self, text: str, intensity: str = "medium", 
-                          max_tokens: int = 2000) -> str:
+                          max_tokens: int = 2000, keywords: Optional[List[str]] = None,
+                          token_counter: Optional[TokenCounter] = None) -> str:
         """
         Complete cleaning and optimization pipeline
         
@@ -299,17 +392,46 @@ class TextCleaner:
             text: Raw extracted text
             intensity: Cleaning intensity ('light', 'medium', 'aggressive')
             max_tokens: Maximum token limit for output
+            keywords: High-value keywords to use instead of the defaults
+            token_counter: Token counter matched to the embedding model
             
         Returns:
             Cleaned and optimized text ready for embedding
         """
         # Step 1: Clean the text
-        cleaned = self.clean_text(text, intensity)
+        cleaned = self.clean_text(text, intensity, keywords)
         
         # Step 2: Truncate if needed
-        optimized = self.truncate_to_token_limit(cleaned, max_tokens)
+        optimized = self.truncate_to_token_limit(cleaned, max_tokens, keywords, token_counter)
         
         return optimized
+    
+    def _clean_document(self, text: str, options: Tuple) -> str:
+        intensity, max_tokens, keywords, token_counter_name = options
+        if max_tokens is None:
+            return self.clean_text(text, intensity, keywords)
+        return self.clean_and_optimize(text, intensity, max_tokens, keywords, TOKEN_COUNTERS[token_counter_name])
+    
+    def clean_batch(self, texts: Iterable[str], intensity: str = "medium", max_tokens: Optional[int] = None,
+                    keywords: Optional[List[str]] = None, token_counter: Optional[TokenCounter] = None,
+                    executor: Optional[Executor] = None, chunk_size: Optional[int] = None) -> List[DocumentResult]:
+        """
+        Clean a batch of texts, and truncate them to max_tokens if given, returning results in order.
+        
+        With an executor (e.g. a ProcessPoolExecutor or the document pool's
+        supervised pool) texts are sent to the workers in chunks, each worker
+        compiling the keyword matcher once. A text that fails to clean only
+        fails its own result.
+        """
+        options = (intensity, max_tokens, keywords, (token_counter or TOKEN_COUNTERS["chars"]).name)
+        if executor is None:
+            return map_documents(self._clean_document, texts, options)
+        return map_documents(_clean_in_worker, texts, options, executor, chunk_size)
+
+
+def _clean_in_worker(text: str, options: Tuple) -> str:
+    """Clean one text of a batch with the worker's cleaner (runs in a worker process)"""
+    return text_cleaner._clean_document(text, options)
 
 
 # Global instance
@@ -0,0 +1,125 @@
+import re
+import math
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+# Paragraph counts remembered per counter, so re-cleaned or re-embedded
+# resumes are not tokenized again
+COUNT_CACHE_SIZE = 1024
+
+
+class TokenCounter:
+    """Interface for fast token count estimates matched to an embedding model's tokenizer"""
+
+    name = ""
+
+    def __init__(self):
+        self.count = lru_cache(maxsize=COUNT_CACHE_SIZE)(self._count)
+
+    def _count(self, text: str) -> int:
+        raise NotImplementedError
+
+    def prefix(self, text: str, max_tokens: int) -> str:
+        """Get the longest leading part of the text that fits in max_tokens"""
+        raise NotImplementedError
+
+
+class CharRatioTokenCounter(TokenCounter):
+    """The original estimate of one token per 4 characters, for models without a known tokenizer"""
+
+    name = "chars"
+
+    def __init__(self, chars_per_token: int = 4):
+        super().__init__()
+        self.chars_per_token = chars_per_token
+
+    def _count(self, text: str) -> int:
+        return len(text) // self.chars_per_token
+
+    def prefix(self, text: str, max_tokens: int) -> str:
+        return text[:max(0, max_tokens) * self.chars_per_token]
+
+
+class WordPieceTokenCounter(TokenCounter):
+    """
+    Approximate count for BERT-style WordPiece tokenizers (nomic-embed-text, mxbai, MiniLM).
+
+    Text is split the way BERT's basic tokenizer does, into words, digit runs
+    and single punctuation marks, and long words are charged extra pieces as
+    the WordPiece vocabulary would split them. Tuned for English text; the
+    budget leaves headroom for its estimate error.
+    """
+
+    name = "wordpiece"
+
+    # Words up to this long are usually whole vocabulary entries; each further
+    # few characters cost another '##' piece
+    WHOLE_WORD_CHARS = 8
+    PIECE_CHARS = 4
+    WHOLE_NUMBER_DIGITS = 4
+    PIECE_DIGITS = 3
+
+    _UNITS = re.compile(r'[^\W\d_]+|\d+|[^\w\s]|_')
+
+    def _unit_tokens(self, unit: str) -> int:
+        length = len(unit)
+        if unit[0].isdigit():
+            whole, piece = self.WHOLE_NUMBER_DIGITS, self.PIECE_DIGITS
+        else:
+            whole, piece = self.WHOLE_WORD_CHARS, self.PIECE_CHARS
+        if length <= whole:
+            return 1
+        return 1 + math.ceil((length - whole) / piece)
+
+    def _count(self, text: str) -> int:
+        tokens = 0
+        for unit in self._UNITS.findall(text):
+            tokens += 1 if len(unit) <= 4 else self._unit_tokens(unit)
+        return tokens
+
+    def prefix(self, text: str, max_tokens: int) -> str:
+        tokens = 0
+        end = 0
+        for match in self._UNITS.finditer(text):
+            tokens += self._unit_tokens(match.group(0))
+            if tokens > max_tokens:
+                break
+            end = match.end()
+        else:
+            return text
+        return text[:end]
+
+
+TOKEN_COUNTERS: Dict[str, TokenCounter] = {
+    counter.name: counter
+    for counter in (CharRatioTokenCounter(), WordPieceTokenCounter())
+}
+
+# Tokenizer and context length (in tokens) of known Ollama embedding models
+MODEL_CONTEXTS: Dict[str, Tuple[str, int]] = {
+    "nomic-embed-text": ("wordpiece", 2048),
+    "mxbai-embed-large": ("wordpiece", 512),
+    "snowflake-arctic-embed": ("wordpiece", 512),
+    "all-minilm": ("wordpiece", 256),
+    "bge-large": ("wordpiece", 512),
+}
+
+# Tokens taken by the [CLS] and [SEP] markers the model adds
+SPECIAL_TOKENS = 2
+
+
+def model_token_budget(model: Optional[str]) -> Tuple[TokenCounter, int]:
+    """
+    Get the token counter and the number of tokens of text to send for a model.
+
+    Known models are filled up to EMBEDDING_CONTEXT_FILL of their context,
+    leaving headroom for estimate error. Other models keep the 4 chars per
+    token estimate and EMBEDDING_MAX_TOKENS.
+    """
+    name = (model or "").split(":")[0]
+    if name in MODEL_CONTEXTS:
+        counter_name, context = MODEL_CONTEXTS[name]
+        return TOKEN_COUNTERS[counter_name], int(context * settings.embedding_context_fill) - SPECIAL_TOKENS
+    return TOKEN_COUNTERS["chars"], settings.embedding_max_tokens
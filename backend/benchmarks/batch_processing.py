@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch cleaning and section parsing over the text of a directory of PDFs.
+
+Run from the backend directory:
+
+    python -m benchmarks.batch_processing ../testdata/resumes
+
+The extracted texts are repeated up to --documents documents, each under
+its own filename. Each row cleans every document, then parses the cleaned
+text into sections, as ingest does: first one call per document in this
+process, then through clean_batch and parse_batch, inline and across a
+process pool of --workers processes. Logging stays enabled at INFO, as
+under a server that logs the application's messages.
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from app.services.section_parser import section_parser
+from app.services.text_cleaner import text_cleaner
+from benchmarks.text_cleaner import extract_texts
+
+
+def run_single(documents):
+    for filename, text in documents:
+        cleaned = text_cleaner.clean_text(text)
+        section_parser.parse_resume(cleaned, filename, return_raw_sections=True)
+
+
+def run_batch(documents, executor=None):
+    cleaned = text_cleaner.clean_batch((text for _, text in documents), executor=executor)
+    parsed = section_parser.parse_batch(
+        ((result.value, filename) for result, (filename, _) in zip(cleaned, documents) if result.ok),
+        return_raw_sections=True,
+        executor=executor
+    )
+    return sum(not result.ok for result in cleaned) + sum(not result.ok for result in parsed)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("directory", help="Directory containing PDF files")
+    arg_parser.add_argument("--documents", type=int, default=2000, help="Documents per pass")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes in the pool")
+    args = arg_parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.pdf")))
+    if not paths:
+        print(f"No PDF files found in {args.directory}")
+        return 1
+
+    texts = [text for text in extract_texts(paths) if text.strip()]
+    documents = [
+        (f"resume_{index}_{os.path.basename(paths[index % len(paths)])}", texts[index % len(texts)])
+        for index in range(max(1, args.documents))
+    ]
+
+    # Handled like a server's log handler, without the terminal output
+    logging.basicConfig(level=logging.INFO, stream=open(os.devnull, "w"))
+
+    print(f"\n{len(documents)} documents from {len(texts)} resumes in {args.directory}\n")
+    print(f"{'mode':<24} {'seconds':>9} {'docs/sec':>10} {'failed':>7}")
+
+    start = time.perf_counter()
+    run_single(documents)
+    seconds = time.perf_counter() - start
+    print(f"{'one at a time':<24} {seconds:>9.2f} {len(documents) / seconds:>10,.0f} {0:>7}")
+
+    start = time.perf_counter()
+    failed = run_batch(documents)
+    seconds = time.perf_counter() - start
+    print(f"{'batch, inline':<24} {seconds:>9.2f} {len(documents) / seconds:>10,.0f} {failed:>7}")
+
+    with ProcessPoolExecutor(max(1, args.workers), mp_context=get_context("spawn")) as executor:
+        # Start the workers and load their modules before timing
+        run_batch(documents[:args.workers], executor)
+        start = time.perf_counter()
+        failed = run_batch(documents, executor)
+        seconds = time.perf_counter() - start
+    print(f"{f'batch, {args.workers} processes':<24} {seconds:>9.2f} {len(documents) / seconds:>10,.0f} {failed:>7}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
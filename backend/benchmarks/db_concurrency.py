@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark reads served while a matching run writes, with and without the SQLite profile.
+
+Run from the backend directory:
+
+    python -m benchmarks.db_concurrency
+
+A database of --positions positions and --resumes resumes with random
+embeddings is created in a temporary directory for each profile, and one
+matching run stores its matches. A second matching run is then timed
+while --readers readers keep loading a position's top matches, as the
+results page does. The readers use their own thread, event loop and
+engine, like a second server worker, so that only database locking (not
+the matching run's CPU time) shows in their latency. "default" leaves
+SQLite's rollback journal, pragmas and SQLAlchemy's pool as they are;
+"tuned" uses the SQLite profile from the settings.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.database import Base, Position, Project, Resume
+from app.models.sqlite_profile import SQLiteProfile
+from app.services.embedding_service import embedding_service
+from app.services.matching_service import matching_service
+
+PROFILES = {
+    "default": SQLiteProfile(journal_mode=None, synchronous=None, mmap_size_mb=None, cache_size_mb=None,
+                             temp_store=None, busy_timeout_ms=None, pool_size=None),
+    "tuned": SQLiteProfile.from_settings(settings),
+}
+
+
+async def create_project(session_factory, positions, resumes, dimension):
+    rng = np.random.default_rng(0)
+    async with session_factory() as db:
+        project = Project(name="benchmark", embedding_backend="local", embedding_model="benchmark")
+        db.add(project)
+        await db.flush()
+        for index in range(positions):
+            db.add(Position(project_id=project.id, original_data={"title": f"Position {index}"},
+                            embedding_columns=["title"], output_columns=["title"],
+                            embedding=embedding_service.serialize_embedding(rng.random(dimension)),
+                            embedding_model="benchmark", embedding_dim=dimension))
+        for index in range(resumes):
+            db.add(Resume(project_id=project.id, filename=f"resume_{index}.pdf", file_path=f"resume_{index}.pdf",
+                          extracted_text="", embedding=embedding_service.serialize_embedding(rng.random(dimension)),
+                          embedding_model="benchmark", embedding_dim=dimension))
+        await db.commit()
+        position_ids = (await db.execute(select(Position.id))).scalars().all()
+        return project.id, position_ids
+
+
+async def read_until(stop, session_factory, project_id, position_ids, readers):
+    """Load top matches with several concurrent readers until stop is set, returning latencies and errors"""
+    latencies = []
+    errors = []
+
+    async def reader(offset):
+        index = offset
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                async with session_factory() as db:
+                    await matching_service.get_top_matches(project_id, position_ids[index % len(position_ids)], 20, db)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(str(e))
+            index += readers
+
+    await asyncio.gather(*(reader(offset) for offset in range(readers)))
+    return latencies, errors
+
+
+def run_profile(name, profile, args):
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite+aiosqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+        async def prepare():
+            engine = profile.create_engine(database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            project_id, position_ids = await create_project(session_factory, args.positions, args.resumes, args.dimension)
+            await matching_service.calculate_matches(project_id, session_factory())
+            await engine.dispose()
+            return project_id, position_ids
+
+        project_id, position_ids = asyncio.run(prepare())
+
+        stop = threading.Event()
+        read_results = {}
+
+        def read_thread():
+            async def read():
+                engine = profile.create_engine(database_url)
+                session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+                read_results["reads"] = await read_until(stop, session_factory, project_id, position_ids, args.readers)
+                await engine.dispose()
+            asyncio.run(read())
+
+        async def write():
+            engine = profile.create_engine(database_url)
+            session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            async with session_factory() as db:
+                start = time.perf_counter()
+                result = await matching_service.calculate_matches(project_id, db)
+                seconds = time.perf_counter() - start
+            await engine.dispose()
+            return result, seconds
+
+        thread = threading.Thread(target=read_thread)
+        thread.start()
+        time.sleep(0.5)  # Let the readers reach a steady state
+        result, seconds = asyncio.run(write())
+        stop.set()
+        thread.join()
+
+    latencies, errors = read_results["reads"]
+    latencies = sorted(latencies) or [0.0]
+    percentile = lambda share: latencies[min(len(latencies) - 1, int(len(latencies) * share))] * 1000
+    print(f"{name:<9} {seconds:>10.2f} {result.get('matches_created', 0):>9} {len(latencies):>7} "
+          f"{percentile(0.5):>8.1f} {percentile(0.95):>8.1f} {latencies[-1] * 1000:>9.1f} {len(errors):>7}")
+    if errors:
+        print(f"          first error: {errors[0]}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--positions", type=int, default=100, help="Positions in the project")
+    arg_parser.add_argument("--resumes", type=int, default=1000, help="Resumes in the project")
+    arg_parser.add_argument("--dimension", type=int, default=256, help="Embedding dimension")
+    arg_parser.add_argument("--readers", type=int, default=4, help="Concurrent readers")
+    arg_parser.add_argument("--profile", choices=["default", "tuned", "both"], default="both")
+    args = arg_parser.parse_args()
+
+    print(f"\n{args.positions} positions x {args.resumes} resumes, {args.readers} readers\n")
+    print(f"{'profile':<9} {'match sec':>10} {'matches':>9} {'reads':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9} {'errors':>7}")
+    for name in (["default", "tuned"] if args.profile == "both" else [args.profile]):
+        run_profile(name, PROFILES[name], args)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark every registered PDF text extractor over a directory of PDFs.
+
+Run from the backend directory:
+
+    python -m benchmarks.pdf_extractors ../testdata/resumes
+
+Reports pages/sec per extractor and how the extracted text length compares
+with the reference extractor on each document.
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+from app.services.pdf_extractors import PDF_EXTRACTORS
+
+
+def run_extractor(extractor, paths, max_pages):
+    """Extract every file, returning per-file character counts and the totals"""
+    characters = {}
+    pages = 0
+    failures = 0
+
+    start = time.perf_counter()
+    for path in paths:
+        try:
+            page_texts, _ = extractor.extract(path, max_pages, float("inf"))
+        except Exception as e:
+            print(f"  {extractor.name}: {os.path.basename(path)} failed: {e}", file=sys.stderr)
+            failures += 1
+            continue
+        pages += len(page_texts)
+        characters[path] = sum(len(page_text.strip()) for page_text in page_texts)
+    seconds = time.perf_counter() - start
+
+    return characters, pages, failures, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory containing PDF files")
+    parser.add_argument("--max-pages", type=int, default=0, help="Pages to extract per document (0 = all)")
+    parser.add_argument("--reference", default="pypdf2", help="Extractor used as the text-length baseline")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.pdf")))
+    if not paths:
+        print(f"No PDF files found in {args.directory}")
+        return 1
+
+    results = {}
+    for name, extractor in PDF_EXTRACTORS.items():
+        if not extractor.is_available():
+            print(f"{name}: not available, skipping")
+            continue
+        results[name] = run_extractor(extractor, paths, args.max_pages)
+
+    reference = results.get(args.reference, (None,))[0]
+
+    print(f"\n{len(paths)} documents from {args.directory}\n")
+    print(f"{'extractor':<12} {'failed':>6} {'pages':>6} {'seconds':>8} {'pages/sec':>10} {'chars':>9} {'parity':>8}")
+    for name, (characters, pages, failures, seconds) in results.items():
+        parity = "-"
+        if reference:
+            # Median per-document text length relative to the reference extractor
+            ratios = [characters[path] / reference[path] for path in characters if reference.get(path)]
+            if ratios:
+                parity = f"{statistics.median(ratios) * 100:.1f}%"
+        pages_per_second = pages / seconds if seconds else 0.0
+        print(
+            f"{name:<12} {failures:>6} {pages:>6} {seconds:>8.2f} {pages_per_second:>10.1f} "
+            f"{sum(characters.values()):>9} {parity:>8}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
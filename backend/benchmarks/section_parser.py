@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the section parser over the text of a directory of PDFs.
+
+Run from the backend directory:
+
+    python -m benchmarks.section_parser ../testdata/resumes
+
+Two timings are reported. Full parsing runs parse_resume on each resume,
+under its own filename so names are removed, both into raw sections and
+into structured data. Header detection runs on CVs of at least --lines
+lines each, joined from the extracted texts, the length of long multi-page
+or badly wrapped extractions. To compare against another revision, copy its
+section_parser.py somewhere importable and pass --parser module:Class.
+"""
+
+import argparse
+import glob
+import importlib
+import logging
+import os
+import sys
+import time
+
+from benchmarks.text_cleaner import extract_texts
+
+
+def load_parser(spec):
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name or "RawSectionParser")()
+
+
+def build_documents(texts, min_lines):
+    """Join texts in turn until each document has at least min_lines lines"""
+    documents = []
+    for start in range(len(texts)):
+        parts = []
+        lines = 0
+        index = start
+        while lines < min_lines:
+            text = texts[index % len(texts)]
+            parts.append(text)
+            lines += text.count("\n") + 1
+            index += 1
+        documents.append("\n".join(parts))
+    return documents
+
+
+def run_parse_resume(parser, resumes, repeat):
+    """Parse every resume repeat times in both output modes, returning the best pass in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for filename, text in resumes:
+            parser.parse_resume(text, filename, return_raw_sections=True)
+            parser.parse_resume(text, filename)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_parser(parser, documents, repeat):
+    """Find the headers of every document repeat times, returning the best pass in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            parser._find_sections(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("directory", help="Directory containing PDF files")
+    arg_parser.add_argument("--lines", type=int, default=1000, help="Minimum lines per benchmarked CV")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Passes over the documents; the fastest is reported")
+    arg_parser.add_argument("--parser", default="app.services.section_parser:RawSectionParser",
+                            help="Parser class to benchmark, as module:Class")
+    args = arg_parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.pdf")))
+    if not paths:
+        print(f"No PDF files found in {args.directory}")
+        return 1
+
+    # The parser logs every section it finds, and warns about every one it misses
+    logging.disable(logging.WARNING)
+
+    resumes = [
+        (os.path.basename(path), text)
+        for path in paths
+        for text in extract_texts([path])
+        if text.strip()
+    ]
+    texts = [text for _, text in resumes]
+    documents = build_documents(texts, max(1, args.lines))
+    lines = sum(document.count("\n") + 1 for document in documents)
+    parser = load_parser(args.parser)
+    repeat = max(1, args.repeat)
+
+    print(f"\n{len(resumes)} resumes from {args.directory} ({args.parser})\n")
+    print(f"{'stage':<18} {'documents':>10} {'ms/pass':>9} {'ms/document':>12}")
+
+    seconds = run_parse_resume(parser, resumes, repeat)
+    print(f"{'parse_resume':<18} {len(resumes):>10} {seconds * 1000:>9.2f} {seconds * 1000 / len(resumes):>12.3f}")
+
+    seconds = run_parser(parser, documents, repeat)
+    print(f"{'headers, ' + str(lines // len(documents)) + ' lines':<18} {len(documents):>10} "
+          f"{seconds * 1000:>9.2f} {seconds * 1000 / len(documents):>12.3f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark TextCleaner throughput over the text of a directory of PDFs.
+
+Run from the backend directory:
+
+    python -m benchmarks.text_cleaner ../testdata/resumes
+
+Text is extracted once up front; only cleaning is timed. Reports chars/sec
+for each cleaning intensity. To compare against another revision, copy its
+text_cleaner.py somewhere importable and pass --cleaner module:Class.
+"""
+
+import argparse
+import glob
+import importlib
+import logging
+import os
+import sys
+import time
+
+from app.services.pdf_extractors import PDF_EXTRACTORS
+
+INTENSITIES = ["light", "medium", "aggressive"]
+
+
+def load_cleaner(spec):
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name or "TextCleaner")()
+
+
+def extract_texts(paths):
+    extractor = PDF_EXTRACTORS["pypdf2"]
+    texts = []
+    for path in paths:
+        try:
+            page_texts, _ = extractor.extract(path, 0, float("inf"))
+        except Exception as e:
+            print(f"  {os.path.basename(path)} failed: {e}", file=sys.stderr)
+            continue
+        texts.append("\n".join(page_texts))
+    return texts
+
+
+def run_cleaner(cleaner, texts, intensity, repeat):
+    """Clean every text repeat times, returning the best pass in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            cleaner.clean_text(text, intensity)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory containing PDF files")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the corpus; the fastest is reported")
+    parser.add_argument("--cleaner", default="app.services.text_cleaner:TextCleaner",
+                        help="Cleaner class to benchmark, as module:Class")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.pdf")))
+    if not paths:
+        print(f"No PDF files found in {args.directory}")
+        return 1
+
+    # The cleaner logs every text it cleans
+    logging.disable(logging.INFO)
+
+    texts = extract_texts(paths)
+    characters = sum(len(text) for text in texts)
+    cleaner = load_cleaner(args.cleaner)
+
+    print(f"\n{len(texts)} documents, {characters} chars from {args.directory} ({args.cleaner})\n")
+    print(f"{'intensity':<12} {'ms/pass':>9} {'chars/sec':>12}")
+    for intensity in INTENSITIES:
+        seconds = run_cleaner(cleaner, texts, intensity, max(1, args.repeat))
+        chars_per_second = characters / seconds if seconds else 0.0
+        print(f"{intensity:<12} {seconds * 1000:>9.2f} {chars_per_second:>12,.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import sqlite3
+
+# Columns added to existing tables after their initial release.
+# New tables are created automatically by init_db() on startup.
+COLUMNS = [
+    ("positions", "embedding_mode", "VARCHAR DEFAULT 'concatenated'"),
+    ("positions", "column_weights", "JSON"),
+    ("projects", "embedding_backend", "VARCHAR DEFAULT 'ollama'"),
+    ("projects", "embedding_model", "VARCHAR"),
+    ("projects", "target_embedding_model", "VARCHAR"),
+    ("positions", "embedding_model", "VARCHAR"),
+    ("positions", "embedding_dim", "INTEGER"),
+    ("resumes", "embedding_model", "VARCHAR"),
+    ("resumes", "embedding_dim", "INTEGER"),
+    ("column_value_embeddings", "embedding_model", "VARCHAR"),
+    ("local_embedding_models", "model_id", "VARCHAR"),
+    ("processing_jobs", "job_type", "VARCHAR DEFAULT 'matching'"),
+    ("resumes", "content_hash", "VARCHAR"),
+    ("extracted_texts", "pages_extracted", "INTEGER"),
+    ("extracted_texts", "extractor", "VARCHAR"),
+    ("processing_jobs", "details", "JSON"),
+    ("parsing_configurations", "high_value_keywords", "JSON"),
+    ("resumes", "parse_config_hash", "VARCHAR"),
+    ("resumes", "cleaned_text_hash", "VARCHAR"),
+    ("resumes", "cleaned_text", "BLOB"),
+    ("resumes", "cleaner_version", "VARCHAR"),
+    ("resumes", "cleaning_intensity", "VARCHAR"),
+]
+
+# Data fixes run after the columns exist. Embeddings stored before model
+# tracking was added were all produced by Ollama's nomic-embed-text.
+STATEMENTS = [
+    "UPDATE projects SET embedding_model = 'ollama:nomic-embed-text' "
+    "WHERE embedding_model IS NULL AND (embedding_backend IS NULL OR embedding_backend = 'ollama')",
+    "UPDATE positions SET embedding_model = 'ollama:nomic-embed-text' "
+    "WHERE embedding_model IS NULL AND embedding IS NOT NULL",
+    "UPDATE resumes SET embedding_model = 'ollama:nomic-embed-text' "
+    "WHERE embedding_model IS NULL AND embedding IS NOT NULL",
+    "UPDATE column_value_embeddings SET embedding_model = 'ollama:nomic-embed-text' "
+    "WHERE embedding_model IS NULL",
+    "DROP INDEX IF EXISTS idx_column_value_project_column_value",
+    # create_all does not add indexes to existing tables. Keep the first of
+    # any duplicates cached while no unique index existed, then recreate it
+    # with the model.
+    "DELETE FROM column_value_embeddings WHERE id NOT IN ("
+    "SELECT MIN(id) FROM column_value_embeddings GROUP BY project_id, embedding_model, \"column\", value)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_column_value_project_model_column_value "
+    "ON column_value_embeddings (project_id, embedding_model, \"column\", value)",
+    "CREATE INDEX IF NOT EXISTS ix_resumes_content_hash ON resumes (content_hash)",
+]
+
+
+def add_columns():
+    """Add columns that are missing from an existing database"""
+
+    # Get the database URL from the environment or use default
+    db_path = os.getenv('DATABASE_URL', 'sqlite:///./data/app.db').replace('sqlite:///', '')
+
+    print(f"Adding columns to database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Database file {db_path} does not exist!")
+        return False
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        for table, column, column_type in COLUMNS:
+            cursor.execute(f"PRAGMA table_info({table})")
+            existing = {row[1] for row in cursor.fetchall()}
+
+            if not existing:
+                print(f"Table {table} does not exist yet, skipping...")
+                continue
+
+            if column in existing:
+                print(f"Column {table}.{column} already exists, skipping...")
+                continue
+
+            alter_sql = f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"
+            print(f"Executing: {alter_sql}")
+            cursor.execute(alter_sql)
+
+        for statement in STATEMENTS:
+            if statement.startswith("UPDATE"):
+                table = statement.split()[1]
+            elif statement.startswith("DELETE FROM"):
+                table = statement.split()[2]
+            elif " ON " in statement:
+                table = statement.split(" ON ")[1].split()[0]
+            else:
+                table = None
+            if table:
+                cursor.execute(f"PRAGMA table_info({table})")
+                if not cursor.fetchall():
+                    continue
+            print(f"Executing: {statement}")
+            cursor.execute(statement)
+
+        conn.commit()
+        conn.close()
+
+        print("✅ All columns added successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error adding columns: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = add_columns()
+    sys.exit(0 if success else 1)